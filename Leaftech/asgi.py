@@ -5,6 +5,11 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Bajo ASGI el stream de video se sirve con un iterador asíncrono, así un
+solo worker atiende a muchos espectadores a la vez:
+
+    uvicorn Leaftech.asgi:application --workers 2
 """
 
 import os
@@ -14,3 +19,12 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Leaftech.settings')
 
 application = get_asgi_application()
+
+# Warm-up del clasificador en segundo plano al arrancar el worker
+# (sin preload_app en gunicorn, este módulo se importa dentro de cada worker)
+from django.conf import settings
+
+if settings.CLASIFICADOR_PRECARGA:
+    from clasificador.infraestructure.classifier_factory import warmup_in_background
+
+    warmup_in_background()
@@ -111,6 +111,25 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Caché
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# El alias 'resultados' comparte el último resultado de cada stream entre
+# workers: Redis si hay REDIS_URL; si no, archivos en el propio host.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'resultados': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    } if os.environ.get('REDIS_URL') else {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CLASIFICADOR_RESULTADOS_DIR', '/tmp/leaftech-resultados'),
+    },
+}
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -151,3 +170,73 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGIN_URL = 'signin'
 LOGIN_REDIRECT_URL = 'clasificador:mis_plantas'
 LOGOUT_REDIRECT_URL = 'index'
+
+# Clasificador de plantas
+# 'keras' carga el .h5 completo (desarrollo); 'tflite' usa el intérprete TFLite + XNNPACK (producción)
+CLASIFICADOR_BACKEND = os.environ.get('CLASIFICADOR_BACKEND', 'keras')
+CLASIFICADOR_MODEL_PATH = os.environ.get('CLASIFICADOR_MODEL_PATH', str(BASE_DIR / 'modelo_plantas_cnn_v5.h5'))
+CLASIFICADOR_LABELS_PATH = os.environ.get('CLASIFICADOR_LABELS_PATH', str(BASE_DIR / 'labels_v5.pkl'))
+# Hilos del intérprete TFLite (0 = todos los núcleos disponibles)
+CLASIFICADOR_TFLITE_THREADS = int(os.environ.get('CLASIFICADOR_TFLITE_THREADS', '0'))
+# Cargar y calentar el modelo en segundo plano al arrancar cada worker (wsgi/asgi)
+CLASIFICADOR_PRECARGA = os.environ.get('CLASIFICADOR_PRECARGA', '1') == '1'
+# Segundos de espera antes de reintentar cargar el clasificador (o conectar con el servicio) tras un fallo
+CLASIFICADOR_REINTENTO = float(os.environ.get('CLASIFICADOR_REINTENTO', '5'))
+# Caché de predicciones por hash perceptual del recorte (0 = desactivada)
+CLASIFICADOR_CACHE_SIZE = int(os.environ.get('CLASIFICADOR_CACHE_SIZE', '256'))
+CLASIFICADOR_CACHE_TTL = float(os.environ.get('CLASIFICADOR_CACHE_TTL', '5'))
+# Bits de dHash (de 64) en que puede diferir un recorte para reutilizar una predicción
+CLASIFICADOR_CACHE_DISTANCIA = int(os.environ.get('CLASIFICADOR_CACHE_DISTANCIA', '4'))
+# Seguimiento de hojas: reclasificar cada N frames y suavizar sobre una ventana de resultados
+CLASIFICADOR_TRACKER_REFRESH = int(os.environ.get('CLASIFICADOR_TRACKER_REFRESH', '15'))
+CLASIFICADOR_TRACKER_WINDOW = int(os.environ.get('CLASIFICADOR_TRACKER_WINDOW', '5'))
+# Servicio de inferencia compartido (CLASIFICADOR_BACKEND='remote'): un proceso
+# dueño del modelo y los workers web como clientes por memoria compartida
+CLASIFICADOR_SERVICE_ADDRESS = os.environ.get('CLASIFICADOR_SERVICE_ADDRESS', '/tmp/leaftech-inferencia.sock')
+CLASIFICADOR_SERVICE_AUTHKEY = os.environ.get('CLASIFICADOR_SERVICE_AUTHKEY', SECRET_KEY)
+CLASIFICADOR_SERVICE_BACKEND = os.environ.get('CLASIFICADOR_SERVICE_BACKEND', 'keras')
+CLASIFICADOR_SERVICE_SLOTS = int(os.environ.get('CLASIFICADOR_SERVICE_SLOTS', '64'))
+CLASIFICADOR_SERVICE_MAX_BATCH = int(os.environ.get('CLASIFICADOR_SERVICE_MAX_BATCH', '32'))
+# Segundos que un worker espera la respuesta del servicio antes de cortar la conexión
+CLASIFICADOR_SERVICE_TIMEOUT = float(os.environ.get('CLASIFICADOR_SERVICE_TIMEOUT', '10'))
+# Registro de modelos versionados (modelos/<versión>/ + puntero ACTIVE); si no
+# existe se usa CLASIFICADOR_MODEL_PATH. El puntero se revisa cada N segundos
+CLASIFICADOR_REGISTRY_DIR = os.environ.get('CLASIFICADOR_REGISTRY_DIR', str(BASE_DIR / 'modelos'))
+CLASIFICADOR_REGISTRY_POLL = float(os.environ.get('CLASIFICADOR_REGISTRY_POLL', '5'))
+# Micro-lotes entre peticiones concurrentes: tamaño máximo (1 = desactivado) y espera máxima
+CLASIFICADOR_MICROBATCH_SIZE = int(os.environ.get('CLASIFICADOR_MICROBATCH_SIZE', '32'))
+CLASIFICADOR_MICROBATCH_WAIT_MS = float(os.environ.get('CLASIFICADOR_MICROBATCH_WAIT_MS', '3'))
+
+# Cámara: resolución, formato y buffer configurados en el dispositivo
+CAMARA_ANCHO = int(os.environ.get('CAMARA_ANCHO', '640'))
+CAMARA_ALTO = int(os.environ.get('CAMARA_ALTO', '480'))
+CAMARA_FOURCC = os.environ.get('CAMARA_FOURCC', 'MJPG')
+CAMARA_BUFFER = int(os.environ.get('CAMARA_BUFFER', '1'))
+# Segundos sin espectadores antes de detener el pipeline y liberar la cámara
+CAMARA_IDLE_SEGUNDOS = float(os.environ.get('CAMARA_IDLE_SEGUNDOS', '2'))
+# Segundos entre pings de los streams SSE cuando el resultado no cambia
+CLASIFICADOR_SSE_PING = float(os.environ.get('CLASIFICADOR_SSE_PING', '15'))
+# Alias de CACHES y segundos de vida del último resultado de cada stream
+CLASIFICADOR_RESULTADOS_CACHE = os.environ.get('CLASIFICADOR_RESULTADOS_CACHE', 'resultados')
+CLASIFICADOR_RESULTADOS_TTL = float(os.environ.get('CLASIFICADOR_RESULTADOS_TTL', '10'))
+# Cada cuántos segundos un stream SSE revisa resultados escritos por otros workers
+CLASIFICADOR_SSE_SYNC = float(os.environ.get('CLASIFICADOR_SSE_SYNC', '0.5'))
+# '1' cuando el servidor no tiene cámara: la página usa la del navegador y envía los frames
+CAMARA_NAVEGADOR = os.environ.get('CAMARA_NAVEGADOR', '0') == '1'
+# Escala de la copia del frame donde se buscan hojas (1 = resolución completa).
+# Ver `manage.py benchmark_deteccion` para el tiempo y la coincidencia de cada escala
+CLASIFICADOR_DETECCION_ESCALA = float(os.environ.get('CLASIFICADOR_DETECCION_ESCALA', '0.5'))
+# Gate de movimiento: fracción de la miniatura que debe cambiar para volver a analizar;
+# por debajo se reutilizan las detecciones del último frame analizado (0 = desactivado).
+# Aun sin cambios, se fuerza un análisis cada N frames
+CLASIFICADOR_MOVIMIENTO_UMBRAL = float(os.environ.get('CLASIFICADOR_MOVIMIENTO_UMBRAL', '0.01'))
+CLASIFICADOR_MOVIMIENTO_REFRESCO = int(os.environ.get('CLASIFICADOR_MOVIMIENTO_REFRESCO', '30'))
+# Cámaras del servidor, separadas por ';' como nombre=uri|prioridad: índice de
+# dispositivo, URL (RTSP/HTTP) o archivo de video (se repite en bucle, para pruebas).
+# El nombre es el ?stream= de video_feed, plant_events y get_plant_data
+CAMARAS = os.environ.get('CAMARAS', '0')
+# Análisis por segundo repartidos entre todas las cámaras (0 = sin límite); los
+# frames sin turno reutilizan las últimas detecciones. Reparto 'turno' (partes
+# iguales) o 'prioridad' (proporcional a la prioridad de cada cámara)
+CLASIFICADOR_PRESUPUESTO_FPS = float(os.environ.get('CLASIFICADOR_PRESUPUESTO_FPS', '0'))
+CAMARAS_REPARTO = os.environ.get('CAMARAS_REPARTO', 'turno')
@@ -14,3 +14,12 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Leaftech.settings')
 
 application = get_wsgi_application()
+
+# Warm-up del clasificador en segundo plano al arrancar el worker
+# (sin preload_app en gunicorn, este módulo se importa dentro de cada worker)
+from django.conf import settings
+
+if settings.CLASIFICADOR_PRECARGA:
+    from clasificador.infraestructure.classifier_factory import warmup_in_background
+
+    warmup_in_background()
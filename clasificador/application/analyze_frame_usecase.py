@@ -0,0 +1,159 @@
+import time
+
+import cv2
+
+
+def analizar_color(color_analyzer, crop):
+    """Porcentajes de color del recorte y el estado de salud que indican, o None."""
+    porcentajes = color_analyzer.detectar_colores_frame(crop)
+    if not porcentajes:
+        return None
+    estado, descripcion = color_analyzer.evaluar_estado_salud(porcentajes)
+    return {
+        'verde': porcentajes['verde'],
+        'amarillo': porcentajes['amarillo'],
+        'marron': porcentajes['marron'],
+        'rojo': porcentajes['rojo'],
+        'estado': estado,
+        'descripcion': descripcion
+    }
+
+
+class AnalyzeFrameUseCase:
+    """
+    Caso de uso: analizar un frame del stream.
+    Detecta hojas, las sigue entre frames, clasifica las nuevas (o las que
+    tocan refresco) y analiza el color de la hoja principal.
+    Cada stream usa su propia instancia (el seguimiento tiene estado).
+    Con draw=False no se dibuja sobre el frame (cuando nadie lo va a ver).
+
+    Con un `motion_gate`, los frames en los que la escena casi no cambió
+    reutilizan las detecciones y resultados del último frame analizado y
+    solo se vuelven a dibujar. Lo mismo con `admit` (una función sin
+    argumentos, p. ej. de FairInferenceScheduler) cuando niega el análisis
+    porque la fuente agotó su parte del presupuesto de inferencia.
+    """
+
+    def __init__(self, classify_usecase, color_analyzer, detector, tracker, color_every=10, draw=True,
+                 motion_gate=None, admit=None):
+        self.classify_usecase = classify_usecase
+        self.color_analyzer = color_analyzer
+        self.detector = detector
+        self.tracker = tracker
+        self.color_every = color_every
+        self.draw = draw
+        self.motion_gate = motion_gate
+        self.admit = admit
+        self.frame_count = 0
+        self._last_color_frame = None
+        self._last = None
+        # Frames analizados y reutilizados, con su tiempo de proceso (incluye
+        # la espera al modelo, que puede correr en el hilo del micro-batching)
+        self.analyzed = 0
+        self.reused = 0
+        self.analyzed_time = 0.0
+        self.reused_time = 0.0
+        self.throttled = 0
+
+    def execute(self, frame):
+        """
+        Dibuja los contornos sobre `frame` y devuelve
+        {"frame": frame, "result": resultado o None, "color": análisis de color o None,
+         "detections": [{"bbox": (x, y, w, h), "label": ..., "prob": ...}, ...]}.
+        """
+        inicio = time.perf_counter()
+        gate = self.motion_gate
+        # El primer frame siempre se analiza (y fija la referencia del gate)
+        reuse = gate is not None and not gate.should_analyze(frame) and self._last is not None
+        if not reuse and self.admit is not None and self._last is not None and not self.admit():
+            reuse = True
+            self.throttled += 1
+            if gate is not None:
+                # El gate ya tomó este frame como referencia sin que se analizara
+                gate.reset()
+        if reuse:
+            result, detections, outlines = self._last
+            analysis = {"frame": frame, "result": result, "color": None, "detections": detections}
+            self._draw(frame, outlines)
+            self.reused += 1
+            self.reused_time += time.perf_counter() - inicio
+            return analysis
+
+        analysis, outlines = self._analyze(frame)
+        self._last = (analysis["result"], analysis["detections"], outlines)
+        self._draw(frame, outlines)
+        self.analyzed += 1
+        self.analyzed_time += time.perf_counter() - inicio
+        return analysis
+
+    def _draw(self, frame, outlines):
+        if self.draw:
+            for c, color, thickness in outlines:
+                cv2.drawContours(frame, [c], -1, color, thickness)
+        self.frame_count += 1
+
+    def _analyze(self, frame):
+        """Devuelve (análisis, contornos a dibujar como (contorno, color, grosor))."""
+        candidates = self.detector.detect(frame)
+        crops = [frame[y:y + h, x:x + w] for _, (x, y, w, h) in candidates]
+
+        # Asociar cada candidato con su hoja y clasificar solo las nuevas
+        # o las que tocan refresco, todas en una sola pasada
+        tracks = self.tracker.update([bbox for _, bbox in candidates])
+        pending = [i for i, track in enumerate(tracks) if self.tracker.needs_classification(track)]
+        results = self.classify_usecase.execute_batch([crops[i] for i in pending])
+        for i, result in zip(pending, results):
+            self.tracker.add_result(tracks[i], result)
+
+        # La hoja seguida por más tiempo define el resultado mostrado
+        principal = max(tracks, key=lambda t: t.hits, default=None)
+        analysis = {
+            "frame": frame,
+            "result": principal.result if principal is not None else None,
+            "color": None,
+            "detections": [],
+        }
+        outlines = []
+
+        for (c, bbox), crop, track in zip(candidates, crops, tracks):
+            result = track.result
+
+            # Si no es una planta, ignorar y no dibujar nada
+            if result["label"] == "No está en los datos":
+                continue
+
+            # Análisis de color cada N frames (contando también los reutilizados)
+            if track is principal and (
+                self._last_color_frame is None or self.frame_count - self._last_color_frame >= self.color_every
+            ):
+                analysis["color"] = self.analizar_color(crop)
+                self._last_color_frame = self.frame_count
+
+            analysis["detections"].append({"bbox": bbox, "label": result["label"], "prob": result["prob"]})
+
+            # Color del contorno según la confianza
+            if result["prob"] < 0.85:
+                outlines.append((c, (0, 255, 255), 2))  # amarillo = baja confianza
+            else:
+                outlines.append((c, (0, 255, 0), 4))
+
+        return analysis, outlines
+
+    def analizar_color(self, crop):
+        return analizar_color(self.color_analyzer, crop)
+
+    def stats(self):
+        """Frames analizados y reutilizados, y tiempo de proceso que ahorró el gate de movimiento."""
+        analyzed_ms = self.analyzed_time / self.analyzed * 1000 if self.analyzed else 0.0
+        reused_ms = self.reused_time / self.reused * 1000 if self.reused else 0.0
+        total = self.analyzed + self.reused
+        return {
+            "frames_analyzed": self.analyzed,
+            "frames_reused": self.reused,
+            "frames_throttled": self.throttled,
+            "skip_ratio": round(self.reused / total, 3) if total else 0.0,
+            "ms_per_analyzed": round(analyzed_ms, 3),
+            "ms_per_reused": round(reused_ms, 3),
+            # Lo que habrían costado los frames reutilizados de haberse analizado
+            "ms_saved": round(self.reused * max(analyzed_ms - reused_ms, 0.0), 1),
+        }
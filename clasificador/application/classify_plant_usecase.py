@@ -6,6 +6,17 @@ class ClassifyPlantUseCase:
 
     def execute(self, image):
         label, prob = self.classifier_service.classify(image)
+        return self._build_result(label, prob)
+
+    def execute_batch(self, images):
+        """Clasifica varias imágenes (p. ej. todos los recortes de un frame) de una vez."""
+        if not images:
+            return []
+        results = self.classifier_service.classify_batch(images)
+        return [self._build_result(label, prob) for label, prob in results]
+
+    @staticmethod
+    def _build_result(label, prob):
         if prob < 0.3:
             return {"label": "No está en los datos", "prob": prob}
-        return {"label": label, "prob": prob}
\ No newline at end of file
+        return {"label": label, "prob": prob}
@@ -0,0 +1,109 @@
+import threading
+import time
+
+
+class _StreamSlot:
+    """Estado de un stream del navegador: su analizador y el frame en espera."""
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.cond = threading.Condition()
+        self.busy = False
+        self.pending = None
+        self.newest_timestamp = None
+        self.last_used = time.monotonic()
+
+
+class LatestFrameAnalysisUseCase:
+    """
+    Caso de uso: analizar frames enviados por cámaras del navegador.
+
+    Cada stream analiza un frame a la vez. Mientras hay uno en proceso, solo
+    el más reciente espera turno: si llega otro, el que esperaba se descarta
+    sin decodificarlo. Un frame con marca de tiempo anterior a la de uno ya
+    aceptado (llegó fuera de orden) también se descarta. Así un cliente
+    lento nunca acumula trabajo atrasado en el servidor.
+
+    Los frames de un mismo stream pueden llegar a distintos workers. Con un
+    `lease` (acquire(stream) -> token o None, release(stream, token)) el
+    límite de un análisis a la vez vale entre procesos: si otro worker está
+    analizando el stream, el frame se descarta y se toma el siguiente.
+    """
+
+    def __init__(self, analyzer_factory, decode, idle_timeout=60.0, lease=None):
+        self.analyzer_factory = analyzer_factory
+        self.decode = decode
+        self.idle_timeout = idle_timeout
+        self.lease = lease
+        self.frames_processed = 0
+        self.frames_dropped = 0
+        self._slots = {}
+        self._lock = threading.Lock()
+
+    def _slot(self, stream):
+        now = time.monotonic()
+        with self._lock:
+            # Olvidar los streams que dejaron de enviar frames
+            for key, slot in list(self._slots.items()):
+                if not slot.busy and slot.pending is None and now - slot.last_used > self.idle_timeout:
+                    del self._slots[key]
+            slot = self._slots.get(stream)
+            if slot is None:
+                slot = _StreamSlot(self.analyzer_factory())
+                self._slots[stream] = slot
+            slot.last_used = now
+            return slot
+
+    def execute(self, stream, data, timestamp=None):
+        """
+        Decodifica y analiza `data` (bytes del JPEG) en el stream `stream`.
+        Devuelve el análisis, o None si el frame se descartó por viejo.
+        Lanza ValueError si el frame no se puede decodificar.
+        """
+        slot = self._slot(stream)
+        ticket = object()
+        with slot.cond:
+            if timestamp is not None and slot.newest_timestamp is not None and timestamp <= slot.newest_timestamp:
+                self.frames_dropped += 1
+                return None
+            if timestamp is not None:
+                slot.newest_timestamp = timestamp
+            # Reemplaza (y descarta) al frame que esperaba turno
+            slot.pending = ticket
+            slot.cond.notify_all()
+            slot.cond.wait_for(lambda: slot.pending is not ticket or not slot.busy)
+            if slot.pending is not ticket:
+                self.frames_dropped += 1
+                return None
+            slot.pending = None
+            slot.busy = True
+
+        token = None
+        try:
+            if self.lease is not None:
+                token = self.lease.acquire(stream)
+                if token is None:
+                    self.frames_dropped += 1
+                    return None
+            frame = self.decode(data)
+            if frame is None:
+                raise ValueError("El frame no es una imagen JPEG válida")
+            analysis = slot.analyzer.execute(frame)
+            self.frames_processed += 1
+            return analysis
+        finally:
+            if token is not None:
+                self.lease.release(stream, token)
+            with slot.cond:
+                slot.busy = False
+                slot.last_used = time.monotonic()
+                slot.cond.notify_all()
+
+    def stats(self):
+        with self._lock:
+            streams = len(self._slots)
+        return {
+            "streams": streams,
+            "frames_processed": self.frames_processed,
+            "frames_dropped": self.frames_dropped,
+        }
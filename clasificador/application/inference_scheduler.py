@@ -0,0 +1,118 @@
+import threading
+import time
+
+
+class _Share:
+    def __init__(self, weight):
+        self.weight = weight
+        self.tokens = 0.0
+        self.granted = 0
+        self.denied = 0
+
+
+class FairInferenceScheduler:
+    """
+    Reparte un presupuesto fijo de análisis por segundo entre varias fuentes.
+
+    Cada fuente recibe una parte del presupuesto proporcional a su peso
+    (todas iguales = turno rotativo; con prioridades, reparto ponderado) y la
+    acumula en su propia cubeta de fichas, de a lo sumo `burst` segundos. Lo
+    que una fuente no usa (su cubeta está llena) se reparte entre las demás
+    según su peso, así el presupuesto no se desperdicia, pero una cámara
+    ocupada nunca consume la parte de las demás.
+
+    `try_acquire` no bloquea: si se niega, el pipeline reutiliza las
+    detecciones del último frame analizado y el video sigue fluido.
+    """
+
+    def __init__(self, budget, burst=1.0, clock=time.monotonic):
+        self.budget = budget
+        self.burst = burst
+        self.clock = clock
+        self._shares = {}
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def register(self, source, weight=1):
+        with self._lock:
+            self._refill()
+            share = self._shares.get(source)
+            if share is None:
+                share = self._shares[source] = _Share(weight)
+                # Arranca con la cubeta llena, como las que ya estaban
+                share.tokens = float("inf")
+            else:
+                share.weight = weight
+            self._rebalance()
+
+    def unregister(self, source):
+        with self._lock:
+            self._refill()
+            self._shares.pop(source, None)
+            self._rebalance()
+
+    def _rebalance(self):
+        """
+        Con el candado tomado: al cambiar las fuentes cambia la parte de cada
+        una. Una fuente que acumuló fichas mientras tenía más presupuesto (p.
+        ej. estando sola) no conserva la ráfaga vieja: si no, al llegar otra
+        cámara se gastaría el presupuesto de ambas mientras la nueva junta su
+        primera ficha. Así, entre todas guardan a lo sumo `burst` segundos del
+        presupuesto (más el mínimo de una ficha por fuente).
+        """
+        for share in self._shares.values():
+            share.tokens = min(share.tokens, self._limit(share))
+
+    def _refill(self):
+        """Con el candado tomado: reparte las fichas ganadas desde la última vez."""
+        now = self.clock()
+        earned = (now - self._last) * self.budget
+        self._last = now
+        # Lo que desborda una cubeta llena se reparte entre las que aún tienen
+        # lugar, según su peso; si todas están llenas, se pierde
+        pending = [share for share in self._shares.values() if share.tokens < self._limit(share)]
+        while earned > 1e-9 and pending:
+            total_weight = sum(share.weight for share in pending)
+            overflow = 0.0
+            for share in pending:
+                share.tokens += earned * share.weight / total_weight
+                limit = self._limit(share)
+                if share.tokens > limit:
+                    overflow += share.tokens - limit
+                    share.tokens = limit
+            earned = overflow
+            pending = [share for share in pending if share.tokens < self._limit(share)]
+
+    def _limit(self, share):
+        """Fichas que puede acumular una fuente: `burst` segundos de su parte (al menos una)."""
+        total_weight = sum(other.weight for other in self._shares.values())
+        return max(1.0, self.budget * share.weight / total_weight * self.burst)
+
+    def try_acquire(self, source):
+        """True si `source` puede analizar un frame ahora (y gasta una ficha)."""
+        with self._lock:
+            self._refill()
+            share = self._shares.get(source)
+            if share is None:
+                return True
+            if share.tokens >= 1.0:
+                share.tokens -= 1.0
+            else:
+                share.denied += 1
+                return False
+            share.granted += 1
+            return True
+
+    def admission(self, source):
+        """Función sin argumentos para AnalyzeFrameUseCase(admit=...)."""
+        return lambda: self.try_acquire(source)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "budget": self.budget,
+                "sources": {
+                    str(source): {"weight": share.weight, "granted": share.granted, "denied": share.denied}
+                    for source, share in self._shares.items()
+                },
+            }
@@ -0,0 +1,103 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatchScheduler:
+    """
+    Planificador de micro-lotes alrededor de ClassifyPlantUseCase.
+
+    Las peticiones concurrentes se encolan y se envían juntas al modelo cuando
+    se llega a `max_batch_size` imágenes o pasan `max_wait` segundos desde la
+    primera; cada llamador recibe su propio resultado a través de un Future.
+    close() termina las peticiones ya encoladas y rechaza las nuevas.
+    """
+
+    def __init__(self, usecase, max_batch_size=32, max_wait=0.003):
+        self.usecase = usecase
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _ensure_started(self):
+        """Con _lock tomado. El hilo se crea con la primera petición, no al importar el módulo."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="micro-lotes", daemon=True)
+            self._thread.start()
+
+    def submit(self, images):
+        """Encola las imágenes y devuelve un Future con la lista de resultados."""
+        future = Future()
+        # Bajo el mismo candado que close(): nada se encola detrás de la marca de cierre
+        with self._lock:
+            if self._closed:
+                future.set_exception(RuntimeError("El planificador de micro-lotes está cerrado"))
+                return future
+            self._ensure_started()
+            self._queue.put((images, future))
+        return future
+
+    def close(self, timeout=None):
+        """Deja de aceptar peticiones y espera a que se resuelvan las encoladas."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            if thread is not None:
+                self._queue.put(None)
+        if thread is not None:
+            thread.join(timeout)
+
+    def execute(self, image):
+        return self.submit([image]).result()[0]
+
+    def execute_batch(self, images):
+        if not images:
+            return []
+        return self.submit(images).result()
+
+    def _next_batch(self):
+        """Devuelve (peticiones del lote, si llegó la marca de cierre)."""
+        first = self._queue.get()
+        if first is None:
+            return [], True
+        pending = [first]
+        count = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while count < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                return pending, True
+            pending.append(item)
+            count += len(item[0])
+        return pending, False
+
+    def _loop(self):
+        closed = False
+        while not closed:
+            pending, closed = self._next_batch()
+            if not pending:
+                continue
+            images = [image for batch, _ in pending for image in batch]
+            try:
+                results = self.usecase.execute_batch(images)
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+
+            start = 0
+            for batch, future in pending:
+                future.set_result(results[start:start + len(batch)])
+                start += len(batch)
@@ -0,0 +1,60 @@
+from clasificador.application.analyze_frame_usecase import analizar_color
+
+
+class OfflineAnalysisUseCase:
+    """
+    Caso de uso: analizar frames grabados, sin tiempo real.
+
+    Cada frame se analiza por separado (sin seguimiento entre frames, porque
+    los frames de un video se reparten entre procesos): se detectan las
+    hojas, todos los recortes de un grupo de frames se clasifican en una sola
+    pasada del modelo y se analiza el color de la hoja más grande.
+    """
+
+    def __init__(self, classify_usecase, color_analyzer, detector):
+        self.classify_usecase = classify_usecase
+        self.color_analyzer = color_analyzer
+        self.detector = detector
+
+    def execute(self, frames):
+        """
+        `frames` es una lista de (fuente, índice, tiempo_ms, frame BGR).
+        Devuelve un registro por frame, en el mismo orden.
+        """
+        detections = []
+        crops = []
+        for _, _, _, frame in frames:
+            candidates = self.detector.detect(frame)
+            detections.append([bbox for _, bbox in candidates])
+            crops.extend(frame[y:y + h, x:x + w] for _, (x, y, w, h) in candidates)
+
+        results = iter(self.classify_usecase.execute_batch(crops))
+
+        records = []
+        for (source, index, time_ms, frame), bboxes in zip(frames, detections):
+            leaves = []
+            for bbox in bboxes:
+                result = next(results)
+                # Si no es una planta, se ignora (igual que en el stream)
+                if result["label"] == "No está en los datos":
+                    continue
+                leaves.append({"bbox": list(bbox), "label": result["label"], "prob": float(result["prob"])})
+
+            record = {
+                "fuente": source,
+                "frame": index,
+                "tiempo_ms": round(time_ms, 1) if time_ms is not None else None,
+                "label": None,
+                "prob": None,
+                "color": None,
+                "detecciones": leaves,
+            }
+            if leaves:
+                # La hoja más grande define el resultado del frame
+                principal = max(leaves, key=lambda d: d["bbox"][2] * d["bbox"][3])
+                record["label"] = principal["label"]
+                record["prob"] = principal["prob"]
+                x, y, w, h = principal["bbox"]
+                record["color"] = analizar_color(self.color_analyzer, frame[y:y + h, x:x + w])
+            records.append(record)
+        return records
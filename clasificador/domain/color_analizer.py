@@ -5,6 +5,16 @@ import numpy as np
 
 class ColorAnalyzer:
 
+    # Rangos HSV (bajo, alto). Se solapan (p. ej. H=20 es amarillo y marrón):
+    # cada color se cuenta por separado y un píxel puede sumar a más de uno
+    VERDE = (np.array([36, 25, 25], np.uint8), np.array([86, 255, 255], np.uint8))
+    MARRON = (np.array([8, 40, 40], np.uint8), np.array([20, 255, 200], np.uint8))
+    # Amarillo y los dos tramos del rojo comparten S >= 100 y V >= 20: esa
+    # condición se evalúa una sola vez y a cada color le queda solo su tono
+    SV_AMARILLO_ROJO = (np.array([0, 100, 20], np.uint8), np.array([255, 255, 255], np.uint8))
+    H_AMARILLO = (20, 35)
+    H_ROJO = ((0, 10), (175, 180))
+
     @staticmethod
     def detectar_colores_frame(frame):
         """
@@ -16,28 +26,18 @@ class ColorAnalyzer:
         # Convertir a HSV
         imageHSV = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
 
-        # Definir rangos de colores para plantas
-        verdeBajo = np.array([36, 25, 25], np.uint8)
-        verdeAlto = np.array([86, 255, 255], np.uint8)
-
-        amarilloBajo = np.array([20, 100, 20], np.uint8)
-        amarilloAlto = np.array([35, 255, 255], np.uint8)
-
-        marronBajo = np.array([8, 40, 40], np.uint8)
-        marronAlto = np.array([20, 255, 200], np.uint8)
-
-        rojoBajo1 = np.array([0, 100, 20], np.uint8)
-        rojoAlto1 = np.array([10, 255, 255], np.uint8)
-        rojoBajo2 = np.array([175, 100, 20], np.uint8)
-        rojoAlto2 = np.array([180, 255, 255], np.uint8)
-
-        # Crear máscaras
-        maskVerde = cv2.inRange(imageHSV, verdeBajo, verdeAlto)
-        maskAmarillo = cv2.inRange(imageHSV, amarilloBajo, amarilloAlto)
-        maskMarron = cv2.inRange(imageHSV, marronBajo, marronAlto)
-        maskRojo1 = cv2.inRange(imageHSV, rojoBajo1, rojoAlto1)
-        maskRojo2 = cv2.inRange(imageHSV, rojoBajo2, rojoAlto2)
-        maskRojo = cv2.add(maskRojo1, maskRojo2)
+        # Máscaras con rango en los tres canales
+        maskVerde = cv2.inRange(imageHSV, *ColorAnalyzer.VERDE)
+        maskMarron = cv2.inRange(imageHSV, *ColorAnalyzer.MARRON)
+
+        # Amarillo y rojo: rango de tono (un solo canal) dentro de la máscara S/V común.
+        # Mismo resultado que inRange con los rangos completos
+        maskSV = cv2.inRange(imageHSV, *ColorAnalyzer.SV_AMARILLO_ROJO)
+        tono = cv2.extractChannel(imageHSV, 0)
+        maskAmarillo = cv2.bitwise_and(cv2.inRange(tono, *ColorAnalyzer.H_AMARILLO), maskSV)
+        (rojoBajo1, rojoAlto1), (rojoBajo2, rojoAlto2) = ColorAnalyzer.H_ROJO
+        maskRojo = cv2.add(cv2.inRange(tono, rojoBajo1, rojoAlto1), cv2.inRange(tono, rojoBajo2, rojoAlto2))
+        maskRojo = cv2.bitwise_and(maskRojo, maskSV)
 
         # Calcular total de píxeles
         total_pixels = frame.shape[0] * frame.shape[1]
@@ -0,0 +1,110 @@
+import cv2
+import numpy as np
+
+
+class LeafDetector:
+    """
+    Busca hojas candidatas (regiones verdes con forma de hoja) en un frame.
+    Las áreas mínima y máxima están pensadas para frames de `reference_size`
+    y se escalan con el tamaño real del frame (p. ej. frames reducidos
+    enviados por el navegador).
+
+    Con `downscale` < 1 la búsqueda (HSV, máscara, morfología y contornos)
+    corre sobre una copia reducida del frame; los contornos y recuadros se
+    devuelven en coordenadas del frame original, de donde salen los recortes.
+    """
+
+    def __init__(self, min_area=8000, max_area=150000, reference_size=(640, 480), downscale=1.0):
+        self.min_area = min_area
+        self.max_area = max_area
+        self.reference_area = reference_size[0] * reference_size[1]
+        self.downscale = downscale
+        # El kernel de 5x5 px se reduce junto con el frame (siempre impar)
+        k = max(1, int(round(5 * downscale)) | 1)
+        self.kernel = np.ones((k, k), np.uint8)
+        self.blur_size = (k, k)
+
+    def detect(self, frame):
+        """Devuelve una lista de (contorno, (x, y, w, h)) que pasan todos los filtros."""
+        small = self.resize(frame)
+        hsv, mask = self.segment(small)
+        contours = self.find_contours(mask)
+        return self.filter(contours, hsv, frame.shape)
+
+    def resize(self, frame):
+        if self.downscale >= 1.0:
+            return frame
+        return cv2.resize(frame, None, fx=self.downscale, fy=self.downscale, interpolation=cv2.INTER_LINEAR)
+
+    def segment(self, frame):
+        """Devuelve (hsv, máscara de verdes limpia)."""
+        # Detección de objetos verdes (plantas)
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+
+        # Rango de verde más natural
+        lower_green = (40, 40, 40)
+        upper_green = (80, 255, 255)
+        mask = cv2.inRange(hsv, lower_green, upper_green)
+
+        # Limpieza de ruido
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.kernel)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self.kernel)
+        mask = cv2.GaussianBlur(mask, self.blur_size, 0)
+        return hsv, mask
+
+    @staticmethod
+    def find_contours(mask):
+        # Buscar contornos (posibles hojas)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        return contours
+
+    def filter(self, contours, hsv, frame_shape):
+        """
+        Aplica los filtros sobre los contornos de `hsv` (posiblemente reducido)
+        y lleva los aceptados a coordenadas de un frame de `frame_shape`.
+        """
+        frame_h, frame_w = frame_shape[:2]
+        sx = frame_w / hsv.shape[1]
+        sy = frame_h / hsv.shape[0]
+        scale = frame_h * frame_w / self.reference_area
+        min_area = self.min_area * scale
+        max_area = self.max_area * scale
+
+        candidates = []
+        for c in contours:
+            # Área medida en la copia reducida, expresada en píxeles del original
+            small_area = cv2.contourArea(c)
+            area = small_area * sx * sy
+
+            # Filtro por área
+            if not (min_area < area < max_area):
+                continue
+
+            # Filtro por circularidad (no cambia con la escala)
+            perimeter = cv2.arcLength(c, True)
+            if perimeter == 0:
+                continue
+            circularity = 4 * np.pi * (small_area / (perimeter * perimeter))
+            if circularity < 0.2 or circularity > 0.9:
+                continue
+
+            # Filtro por aspect ratio
+            x, y, w, h = cv2.boundingRect(c)
+            aspect_ratio = (w * sx) / float(h * sy)
+            if not (0.5 < aspect_ratio < 2.0):
+                continue
+
+            # Validación de color verde
+            mean_hsv = cv2.mean(hsv[y:y + h, x:x + w])
+            if not (35 <= mean_hsv[0] <= 85 and mean_hsv[1] > 40 and mean_hsv[2] > 50):
+                continue
+
+            if hsv.shape[:2] != (frame_h, frame_w):
+                # De vuelta a resolución completa: de ahí salen los recortes
+                c = np.round(c * (sx, sy)).astype(np.int32)
+                x0, y0 = int(round(x * sx)), int(round(y * sy))
+                x1, y1 = min(int(round((x + w) * sx)), frame_w), min(int(round((y + h) * sy)), frame_h)
+                x, y, w, h = x0, y0, x1 - x0, y1 - y0
+            candidates.append((c, (x, y, w, h)))
+
+        return candidates
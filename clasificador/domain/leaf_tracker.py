@@ -0,0 +1,114 @@
+from collections import deque
+
+
+def iou(a, b):
+    """Intersección sobre unión de dos cajas (x, y, w, h)."""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / union if union > 0 else 0.0
+
+
+class LeafTrack:
+    """Una hoja seguida a lo largo de varios frames."""
+
+    def __init__(self, track_id, bbox, window):
+        self.id = track_id
+        self.bbox = bbox
+        self.hits = 1
+        self.missed = 0
+        self.last_classified = None
+        self.history = deque(maxlen=window)
+
+    def needs_classification(self, frame_index, every):
+        """Se clasifica al aparecer y luego cada `every` frames."""
+        return self.last_classified is None or frame_index - self.last_classified >= every
+
+    def add_result(self, result, frame_index):
+        self.history.append((result["label"], float(result["prob"])))
+        self.last_classified = frame_index
+
+    @property
+    def result(self):
+        """
+        Resultado suavizado de la ventana: la etiqueta con mayor probabilidad
+        acumulada y la probabilidad media de esa etiqueta.
+        """
+        if not self.history:
+            return None
+        scores = {}
+        for label, prob in self.history:
+            total, count = scores.get(label, (0.0, 0))
+            scores[label] = (total + prob, count + 1)
+        label = max(scores, key=lambda k: scores[k][0])
+        total, count = scores[label]
+        return {"label": label, "prob": total / count}
+
+
+class LeafTracker:
+    """
+    Seguimiento multi-objeto por IoU: asocia las detecciones de cada frame
+    con las hojas ya conocidas para no reclasificarlas en cada frame.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_missed=5, reclassify_every=15, window=5):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.reclassify_every = reclassify_every
+        self.window = window
+        self.tracks = []
+        self.frame_index = 0
+        self._next_id = 1
+
+    def update(self, bboxes):
+        """
+        Recibe las cajas detectadas en el frame y devuelve, en el mismo orden,
+        el track asignado a cada una (existente o nuevo).
+        """
+        self.frame_index += 1
+
+        # Emparejamiento voraz por IoU descendente
+        pairs = []
+        for ti, track in enumerate(self.tracks):
+            for di, bbox in enumerate(bboxes):
+                overlap = iou(track.bbox, bbox)
+                if overlap >= self.iou_threshold:
+                    pairs.append((overlap, ti, di))
+        pairs.sort(reverse=True)
+
+        assigned = [None] * len(bboxes)
+        used_tracks = set()
+        for _, ti, di in pairs:
+            if ti in used_tracks or assigned[di] is not None:
+                continue
+            track = self.tracks[ti]
+            track.bbox = bboxes[di]
+            track.hits += 1
+            track.missed = 0
+            assigned[di] = track
+            used_tracks.add(ti)
+
+        # Hojas no vistas en este frame: se conservan unos frames por si reaparecen
+        for ti, track in enumerate(self.tracks):
+            if ti not in used_tracks:
+                track.missed += 1
+        self.tracks = [t for t in self.tracks if t.missed <= self.max_missed]
+
+        # Detecciones sin track: hojas nuevas
+        for di, bbox in enumerate(bboxes):
+            if assigned[di] is None:
+                track = LeafTrack(self._next_id, bbox, self.window)
+                self._next_id += 1
+                self.tracks.append(track)
+                assigned[di] = track
+
+        return assigned
+
+    def needs_classification(self, track):
+        return track.needs_classification(self.frame_index, self.reclassify_every)
+
+    def add_result(self, track, result):
+        track.add_result(result, self.frame_index)
@@ -0,0 +1,49 @@
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Decide si un frame cambió lo suficiente como para volver a analizarlo.
+
+    Compara una miniatura en gris del frame contra la del último frame
+    analizado (no contra el anterior, así un cambio lento también se acumula
+    y termina disparando el análisis). El cambio es la fracción de píxeles
+    de la miniatura que difieren en más de `pixel_threshold` niveles: el
+    ruido del sensor no la mueve, pero una hoja que se desplaza sí, aunque
+    ocupe poco del frame. Cada `refresh_every` frames se fuerza un análisis
+    completo aunque la escena no cambie.
+    """
+
+    def __init__(self, threshold=0.01, pixel_threshold=6, size=(64, 48), refresh_every=30):
+        self.threshold = threshold
+        self.pixel_threshold = pixel_threshold
+        self.size = size
+        self.refresh_every = refresh_every
+        self.frames = 0
+        self.skipped = 0
+        self._reference = None
+        self._since_refresh = 0
+
+    def should_analyze(self, frame):
+        """True si hay que analizar `frame`; False si se pueden reutilizar las detecciones."""
+        self.frames += 1
+        thumb = cv2.cvtColor(cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        self._since_refresh += 1
+        if self._reference is not None and self._since_refresh < self.refresh_every:
+            # Fracción de píxeles de la miniatura que cambiaron
+            change = np.count_nonzero(cv2.absdiff(thumb, self._reference) > self.pixel_threshold) / thumb.size
+            if change < self.threshold:
+                self.skipped += 1
+                return False
+        self._reference = thumb
+        self._since_refresh = 0
+        return True
+
+    def reset(self):
+        """Olvida la referencia: el próximo frame se analiza."""
+        self._reference = None
+
+    @property
+    def skip_ratio(self):
+        return self.skipped / self.frames if self.frames else 0.0
@@ -6,4 +6,12 @@ class PlantClassifierPort(ABC):
     @abstractmethod
     def classify(self, image):
         """Recibe una imagen y devuelve (nombre, probabilidad)."""
-        pass
\ No newline at end of file
+        pass
+
+    def classify_batch(self, images):
+        """
+        Recibe una lista de imágenes y devuelve una lista de (nombre, probabilidad)
+        en el mismo orden. Los adaptadores que puedan procesar varias imágenes
+        en una sola pasada deben sobrescribir este método.
+        """
+        return [self.classify(image) for image in images]
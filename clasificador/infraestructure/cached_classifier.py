@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from clasificador.domain.plant_classifier import PlantClassifierPort
+
+
+def dhash(image, hash_size=8, margin=2.0):
+    """
+    Hash perceptual por diferencias (dHash) de 64 bits, como entero.
+
+    Un bit vale 1 solo si la celda de la derecha es `margin` niveles de gris
+    más clara: en una hoja uniforme las celdas vecinas son casi iguales y,
+    sin ese margen, el ruido del sensor cambiaría sus bits en cada frame.
+    Los pocos bits cerca del margen que aún cambian los tolera la caché
+    comparando por distancia de Hamming.
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image.astype(np.float32), (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    return int.from_bytes(np.packbits(small[:, 1:] - small[:, :-1] > margin).tobytes(), "big")
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+class CachedPlantClassifier(PlantClassifierPort):
+    """
+    Decorador del puerto con caché LRU + TTL indexada por dHash del recorte.
+    Un acierto devuelve la etiqueta y probabilidad guardadas sin tocar TensorFlow.
+
+    Un recorte acierta con la entrada más cercana a `max_distance` bits o
+    menos: el hash exacto casi nunca se repite entre frames reales de la
+    cámara. Recorrer las `max_size` entradas cuesta menos de 0,1 ms, frente
+    a los milisegundos de una inferencia.
+    """
+
+    def __init__(self, classifier, max_size=256, ttl=5.0, max_distance=4):
+        self.classifier = classifier
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key, now):
+        expired = [k for k, (_, expires_at) in self._entries.items() if expires_at < now]
+        for k in expired:
+            del self._entries[k]
+
+        if key not in self._entries:
+            best = self.max_distance + 1
+            for k in self._entries:
+                distance = hamming(key, k)
+                if distance < best:
+                    key, best = k, distance
+            if best > self.max_distance:
+                return None
+        self._entries.move_to_end(key)
+        return self._entries[key][0]
+
+    def _put(self, key, result, now):
+        self._entries[key] = (result, now + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def classify(self, image):
+        return self.classify_batch([image])[0]
+
+    def classify_batch(self, images):
+        keys = [dhash(image) for image in images]
+        results = [None] * len(images)
+        now = time.monotonic()
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                results[i] = self._get(key, now)
+        missing = [i for i, result in enumerate(results) if result is None]
+
+        if missing:
+            fresh = self.classifier.classify_batch([images[i] for i in missing])
+            now = time.monotonic()
+            with self._lock:
+                for i, result in zip(missing, fresh):
+                    results[i] = result
+                    self._put(keys[i], result, now)
+
+        with self._lock:
+            self.hits += len(images) - len(missing)
+            self.misses += len(missing)
+        return results
+
+    def stats(self):
+        """Contadores de aciertos/fallos de la caché."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "size": len(self._entries),
+            }
@@ -0,0 +1,78 @@
+import threading
+
+import cv2
+
+
+class LatestFrameCamera:
+    """
+    Lector de cámara en su propio hilo que conserva solo el frame más reciente.
+
+    Si el procesamiento es más lento que la cámara, los frames intermedios se
+    descartan (y se cuentan) en lugar de acumularse en el buffer del driver,
+    así el stream nunca se queda atrás del tiempo real.
+    """
+
+    def __init__(self, source=0, width=640, height=480, fourcc="MJPG", buffer_size=1, capture_factory=cv2.VideoCapture):
+        self.source = source
+        self.size = (width, height)
+        self.cap = capture_factory(source)
+        # Resolución, formato y buffer se configuran en el dispositivo, no en Python
+        if fourcc:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self._frame = None
+        self._seq = 0
+        self._last_read = 0
+        self._running = True
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._reader, name=f"camara-{source}", daemon=True)
+        self._thread.start()
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def _reader(self):
+        while self._running:
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            # Solo si el dispositivo ignoró la resolución pedida
+            if (frame.shape[1], frame.shape[0]) != self.size:
+                frame = cv2.resize(frame, self.size)
+            with self._cond:
+                if self._seq > self._last_read:
+                    # El frame anterior nunca llegó a procesarse
+                    self.frames_dropped += 1
+                self._frame = frame
+                self._seq += 1
+                self.frames_captured += 1
+                self._cond.notify_all()
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def read(self, timeout=5.0):
+        """Espera un frame más nuevo que el último entregado y lo devuelve como cap.read()."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > self._last_read or not self._running, timeout)
+            if self._seq <= self._last_read:
+                return False, None
+            self._last_read = self._seq
+            return True, self._frame
+
+    def stats(self):
+        return {
+            "source": str(self.source),
+            "frames_captured": self.frames_captured,
+            "frames_dropped": self.frames_dropped,
+        }
+
+    def release(self):
+        self._running = False
+        self._thread.join(timeout=2)
+        self.cap.release()
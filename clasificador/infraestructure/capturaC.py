@@ -3,15 +3,22 @@ import cv2
 import sys
 import os
 import django
+from django.conf import settings
 from clasificador.domain.color_analizer import ColorAnalyzer
+from clasificador.infraestructure.camera_sources import CameraRegistry, parse_sources
 from clasificador.models import Planta
 from datetime import datetime
 
 
 
-def capturar_y_analizar():
-    # Inicializar cámara
-    cap = cv2.VideoCapture(0)
+def capturar_y_analizar(camara=None):
+    # Inicializar cámara (por nombre, de CAMARAS; por defecto la primera)
+    camaras = CameraRegistry(parse_sources(settings.CAMARAS))
+    fuente = camaras.get(camara) if camara is not None else camaras.default()
+    if fuente is None:
+        print(f"Error: La cámara {camara!r} no está en CAMARAS")
+        return
+    cap = fuente.open()
 
     if not cap.isOpened():
         print("Error: No se pudo acceder a la cámara")
@@ -111,4 +118,4 @@ def guardar_analisis(analisis):
 
 
 if __name__ == "__main__":
-    capturar_y_analizar()
\ No newline at end of file
+    capturar_y_analizar(sys.argv[1] if len(sys.argv) > 1 else None)
\ No newline at end of file
@@ -0,0 +1,121 @@
+import threading
+import time
+
+from django.conf import settings
+
+from clasificador.domain.plant_classifier import PlantClassifierPort
+
+
+def _build_local(backend, model_path, labels_path, tflite_threads=None):
+    """Adaptador que ejecuta el modelo en este mismo proceso."""
+    if backend == "tflite":
+        from clasificador.infraestructure.tflite_classifier import TFLitePlantClassifier
+        if tflite_threads is None:
+            tflite_threads = settings.CLASIFICADOR_TFLITE_THREADS
+        return TFLitePlantClassifier(model_path, labels_path, tflite_threads)
+
+    if backend == "keras":
+        from clasificador.infraestructure.tf_classifier import TensorflowPlantClassifier
+        return TensorflowPlantClassifier(model_path, labels_path)
+
+    raise ValueError(f"CLASIFICADOR_BACKEND desconocido: {backend!r} (use 'keras', 'tflite' o 'remote')")
+
+
+def get_registry():
+    from clasificador.infraestructure.model_registry import ModelRegistry
+    return ModelRegistry(settings.CLASIFICADOR_REGISTRY_DIR)
+
+
+def build_classifier(backend=None, tflite_threads=None):
+    """
+    Construye el adaptador de clasificación según CLASIFICADOR_BACKEND:
+    'keras' (modelo .h5 completo, desarrollo), 'tflite' (runtime ligero, producción)
+    o 'remote' (cliente del servicio de inferencia, ver manage.py servidor_inferencia).
+    `tflite_threads` reemplaza a CLASIFICADOR_TFLITE_THREADS (p. ej. 1 en un pool de procesos).
+
+    Si el registro de modelos tiene una versión activa se usa esa (con cambio
+    en caliente, ver manage.py modelos); si no, CLASIFICADOR_MODEL_PATH.
+    """
+    backend = backend or settings.CLASIFICADOR_BACKEND
+
+    if backend == "remote":
+        from clasificador.infraestructure.inference_service import RemotePlantClassifier
+        return RemotePlantClassifier(
+            settings.CLASIFICADOR_SERVICE_ADDRESS,
+            settings.CLASIFICADOR_SERVICE_AUTHKEY.encode(),
+            slots=settings.CLASIFICADOR_SERVICE_SLOTS,
+            retry_interval=settings.CLASIFICADOR_REINTENTO,
+            timeout=settings.CLASIFICADOR_SERVICE_TIMEOUT,
+        )
+
+    registry = get_registry()
+    if registry.exists():
+        from clasificador.infraestructure.model_registry import HotSwapPlantClassifier
+        return HotSwapPlantClassifier(
+            registry,
+            lambda model_path, labels_path: _build_local(backend, model_path, labels_path, tflite_threads),
+            poll_interval=settings.CLASIFICADOR_REGISTRY_POLL,
+        )
+
+    return _build_local(backend, settings.CLASIFICADOR_MODEL_PATH, settings.CLASIFICADOR_LABELS_PATH, tflite_threads)
+
+
+# Instancia única por proceso, creada bajo demanda (TensorFlow no se importa
+# en manage.py migrate, collectstatic, etc.)
+_classifier = None
+_classifier_lock = threading.Lock()
+_estado = {"estado": "sin_cargar", "error": None}
+# Tras un fallo no se reintenta antes de este instante: sin esto cada frame
+# volvería a cargar el modelo (o a conectar con el servicio caído)
+_reintento = {"desde": 0.0}
+
+
+def get_classifier():
+    """Devuelve el clasificador del proceso, cargándolo (y calentándolo) la primera vez."""
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                if _estado["estado"] == "error" and time.monotonic() < _reintento["desde"]:
+                    raise RuntimeError(f"Clasificador no disponible: {_estado['error']}")
+                _estado.update(estado="cargando", error=None)
+                try:
+                    _classifier = build_classifier()
+                except Exception as e:
+                    _estado.update(estado="error", error=str(e))
+                    _reintento["desde"] = time.monotonic() + settings.CLASIFICADOR_REINTENTO
+                    raise
+                _estado.update(estado="listo")
+    return _classifier
+
+
+def warmup_in_background():
+    """Carga el modelo en un hilo aparte para que el worker acepte peticiones de inmediato."""
+    def _cargar():
+        try:
+            get_classifier()
+        except Exception as e:
+            print(f"❌ Error al precargar el clasificador: {e}")
+
+    threading.Thread(target=_cargar, name="clasificador-warmup", daemon=True).start()
+
+
+def classifier_status():
+    """Estado de carga para el endpoint de readiness."""
+    return {
+        "ready": _estado["estado"] == "listo",
+        "estado": _estado["estado"],
+        "backend": settings.CLASIFICADOR_BACKEND,
+        "version": getattr(_classifier, "version", None),
+        "error": _estado["error"],
+    }
+
+
+class LazyPlantClassifier(PlantClassifierPort):
+    """Adaptador que delega en el clasificador del proceso sin cargarlo al importarse."""
+
+    def classify(self, image):
+        return get_classifier().classify(image)
+
+    def classify_batch(self, images):
+        return get_classifier().classify_batch(images)
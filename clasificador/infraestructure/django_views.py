@@ -1,141 +1,327 @@
-from django.http import JsonResponse, StreamingHttpResponse
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
 import cv2
+import json
 import numpy as np
+import time
+from clasificador.application.analyze_frame_usecase import AnalyzeFrameUseCase
 from clasificador.application.classify_plant_usecase import ClassifyPlantUseCase
-from clasificador.infraestructure.tf_classifier import TensorflowPlantClassifier
-from clasificador.domain.color_analizer import ColorAnalyzer
+from clasificador.application.frame_upload_usecase import LatestFrameAnalysisUseCase
+from clasificador.application.inference_scheduler import FairInferenceScheduler
+from clasificador.application.micro_batching import MicroBatchScheduler
+from clasificador.infraestructure.cached_classifier import CachedPlantClassifier
+from clasificador.infraestructure.camera import LatestFrameCamera
+from clasificador.infraestructure.camera_sources import CameraRegistry, parse_sources
+from clasificador.infraestructure.classifier_factory import LazyPlantClassifier, classifier_status
+from clasificador.infraestructure.instrumentation import TimedColorAnalyzer, TimedLeafDetector, TimedPlantClassifier
+from clasificador.infraestructure.metrics import REGISTRY, Gauge
+from clasificador.infraestructure.result_events import snapshot
+from clasificador.infraestructure.result_store import DetectionResultStore, StreamLease
+from clasificador.infraestructure.video_pipeline import all_pipelines, get_pipeline
+from clasificador.domain.leaf_tracker import LeafTracker
+from clasificador.domain.motion_gate import MotionGate
 from clasificador.models import EspeciePlanta
 from django.core.exceptions import ObjectDoesNotExist
 
-classifier_service = TensorflowPlantClassifier("modelo_plantas_cnn_v5.h5", "labels_v5.pkl")
+# El modelo se carga en la primera clasificación (o en el warm-up del worker).
+# Cada llamada real al modelo (las que no resuelve el caché) se mide en /metrics
+model_calls = TimedPlantClassifier(LazyPlantClassifier())
+classifier_service = model_calls
+if settings.CLASIFICADOR_CACHE_SIZE > 0:
+    # Recortes casi idénticos entre frames reutilizan la predicción anterior
+    classifier_service = CachedPlantClassifier(
+        classifier_service,
+        max_size=settings.CLASIFICADOR_CACHE_SIZE,
+        ttl=settings.CLASIFICADOR_CACHE_TTL,
+        max_distance=settings.CLASIFICADOR_CACHE_DISTANCIA,
+    )
 usecase = ClassifyPlantUseCase(classifier_service)
-color_analyzer = ColorAnalyzer()
-
-# Variables globales para el estado actual
-last_result = {"label": "Detectando...", "prob": 0.0}
-last_color_analysis = {
-    'verde': 0,
-    'amarillo': 0,
-    'marron': 0,
-    'rojo': 0,
-    'estado': 0,
-    'descripcion': 'Analizando...'
-}
-
-def generate_video():
-    """Genera el stream de video con detección y análisis en tiempo real"""
-    global last_result, last_color_analysis
-    cap = cv2.VideoCapture(0)
-    # cap = cv2.VideoCapture(0)
-    frame_count = 0
+if settings.CLASIFICADOR_MICROBATCH_SIZE > 1:
+    # Los recortes de streams concurrentes comparten una misma pasada del modelo
+    usecase = MicroBatchScheduler(
+        usecase,
+        max_batch_size=settings.CLASIFICADOR_MICROBATCH_SIZE,
+        max_wait=settings.CLASIFICADOR_MICROBATCH_WAIT_MS / 1000,
+    )
+color_analyzer = TimedColorAnalyzer()
+
+# Último resultado por stream, compartido entre workers (ver CACHES en settings)
+result_store = DetectionResultStore(
+    caches[settings.CLASIFICADOR_RESULTADOS_CACHE],
+    ttl=settings.CLASIFICADOR_RESULTADOS_TTL,
+)
+# Un solo worker a la vez analiza los frames subidos de un mismo stream
+analysis_lease = StreamLease(caches[settings.CLASIFICADOR_RESULTADOS_CACHE])
+
+
+# Cámaras del servidor (dispositivos, URLs o videos de prueba), ver CAMARAS en settings
+cameras = CameraRegistry(parse_sources(settings.CAMARAS))
+
+# Presupuesto de análisis por segundo repartido entre todas las cámaras
+inference_scheduler = None
+if settings.CLASIFICADOR_PRESUPUESTO_FPS > 0:
+    inference_scheduler = FairInferenceScheduler(settings.CLASIFICADOR_PRESUPUESTO_FPS)
+
+
+def _default_stream():
+    camera = cameras.default()
+    return camera.name if camera is not None else '0'
+
+
+def _stream_key(request):
+    """Stream (cámara) cuyo resultado se consulta; por defecto la primera cámara registrada"""
+    return request.GET.get('stream') or _default_stream()
+
+
+def _open_camera(name):
+    camera = cameras.get(name)
+    return LatestFrameCamera(
+        # El nombre, no el uri: una URL puede llevar usuario y clave
+        camera.name,
+        width=settings.CAMARA_ANCHO,
+        height=settings.CAMARA_ALTO,
+        fourcc=settings.CAMARA_FOURCC,
+        buffer_size=settings.CAMARA_BUFFER,
+        capture_factory=lambda _: camera.open(),
+    )
+
+
+def _build_analyzer(draw=True, downscale=None, admit=None):
+    # Seguimiento de hojas: cada una se clasifica al aparecer y cada N frames
+    tracker = LeafTracker(reclassify_every=settings.CLASIFICADOR_TRACKER_REFRESH,
+                          window=settings.CLASIFICADOR_TRACKER_WINDOW)
+    # La búsqueda de candidatos corre sobre una copia reducida del frame
+    if downscale is None:
+        downscale = settings.CLASIFICADOR_DETECCION_ESCALA
+    detector = TimedLeafDetector(downscale=downscale)
+    # Escena casi quieta: se reutilizan las detecciones del último frame analizado
+    motion_gate = None
+    if settings.CLASIFICADOR_MOVIMIENTO_UMBRAL > 0:
+        motion_gate = MotionGate(threshold=settings.CLASIFICADOR_MOVIMIENTO_UMBRAL,
+                                 refresh_every=settings.CLASIFICADOR_MOVIMIENTO_REFRESCO)
+    return AnalyzeFrameUseCase(usecase, color_analyzer, detector, tracker, draw=draw, motion_gate=motion_gate,
+                               admit=admit)
+
+
+def _decode_jpeg(data):
+    # np.frombuffer no copia los bytes del cuerpo de la petición
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+
+# Frames enviados por cámaras del navegador: un analizador por stream y
+# solo el frame más reciente de cada cliente espera turno
+frame_uploads = LatestFrameAnalysisUseCase(
+    # El navegador ya envía el frame reducido: se busca a su resolución
+    lambda: _build_analyzer(draw=False, downscale=1.0),
+    _decode_jpeg,
+    idle_timeout=settings.CLASIFICADOR_RESULTADOS_TTL * 6,
+    lease=analysis_lease,
+)
+
+
+def _get_video_pipeline(camera):
+    name = camera.name
+
+    def publish_analysis(analysis):
+        # Lo que consultan get_last_result, get_plant_data y los streams SSE
+        result_store.update(name, analysis["result"], analysis["color"])
+
+    def build_analyzer():
+        if inference_scheduler is None:
+            return _build_analyzer()
+        # Con CAMARAS_REPARTO='prioridad' la parte de cada cámara sigue su prioridad
+        weight = camera.priority if settings.CAMARAS_REPARTO == 'prioridad' else 1
+        inference_scheduler.register(name, weight)
+        return _build_analyzer(admit=inference_scheduler.admission(name))
+
+    def release_share():
+        # Una cámara detenida deja de contar en el reparto del presupuesto
+        if inference_scheduler is not None:
+            inference_scheduler.unregister(name)
+
+    return get_pipeline(
+        name,
+        camera_factory=_open_camera,
+        analyzer_factory=build_analyzer,
+        on_analysis=publish_analysis,
+        idle_timeout=settings.CAMARA_IDLE_SEGUNDOS,
+        on_stop=release_share,
+    )
+
+
+def _mjpeg_chunk(jpeg):
+    return (b'--frame\r\n'
+            b'Content-Type: image/jpeg\r\n\r\n' + jpeg + b'\r\n')
+
+
+def generate_video(camera):
+    """
+    Genera el stream de video con detección y análisis en tiempo real.
+    Todos los espectadores de una cámara comparten un único pipeline.
+    """
+    subscription = _get_video_pipeline(camera).subscribe()
+    try:
+        for jpeg in subscription:
+            yield _mjpeg_chunk(jpeg)
+    finally:
+        # El cliente se desconectó: si era el último, el pipeline libera la cámara
+        subscription.close()
+
+
+async def agenerate_video(camera):
+    """
+    Versión asíncrona de generate_video para ASGI: cada espectador espera en
+    el event loop en lugar de ocupar un hilo del worker.
+    """
+    subscription = _get_video_pipeline(camera).subscribe_async()
+    try:
+        async for jpeg in subscription:
+            yield _mjpeg_chunk(jpeg)
+    finally:
+        # Django cancela el stream cuando el cliente se desconecta
+        subscription.close()
+
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        # Redimensionar frame para mejor rendimiento
-        frame = cv2.resize(frame, (640, 480))
-
-        # Detección de objetos verdes (plantas)
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-
-        # Rango de verde más natural
-        lower_green = (40, 40, 40)
-        upper_green = (80, 255, 255)
-        mask = cv2.inRange(hsv, lower_green, upper_green)
-
-        # Limpieza de ruido
-        kernel = np.ones((5, 5), np.uint8)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-        mask = cv2.GaussianBlur(mask, (5, 5), 0)
-
-        # Buscar contornos (posibles hojas)
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-        for c in contours:
-            area = cv2.contourArea(c)
-
-            # Filtro por área
-            if not (8000 < area < 150000):
-                continue
-
-            # Filtro por circularidad
-            perimeter = cv2.arcLength(c, True)
-            if perimeter == 0:
-                continue
-            circularity = 4 * np.pi * (area / (perimeter * perimeter))
-            if circularity < 0.2 or circularity > 0.9:
-                continue
-
-            # Filtro por aspect ratio
-            x, y, w, h = cv2.boundingRect(c)
-            aspect_ratio = w / float(h)
-            if not (0.5 < aspect_ratio < 2.0):
-                continue
-
-            # Validación de color verde
-            mean_hsv = cv2.mean(hsv[y:y + h, x:x + w])
-            if not (35 <= mean_hsv[0] <= 85 and mean_hsv[1] > 40 and mean_hsv[2] > 50):
-                continue
-
-            # Recortar región de interés
-            crop = frame[y:y + h, x:x + w]
-
-            # Clasificación de planta
-            result = usecase.execute(crop)
-            last_result = result
-
-            # Si no es una planta, ignorar y no dibujar nada
-            if result["label"] == "No está en los datos":
-                continue
-
-            # Análisis de color cada 10 frames
-            if frame_count % 10 == 0:
-                porcentajes = color_analyzer.detectar_colores_frame(crop)
-                if porcentajes:
-                    estado, descripcion = color_analyzer.evaluar_estado_salud(porcentajes)
-                    last_color_analysis = {
-                        'verde': porcentajes['verde'],
-                        'amarillo': porcentajes['amarillo'],
-                        'marron': porcentajes['marron'],
-                        'rojo': porcentajes['rojo'],
-                        'estado': estado,
-                        'descripcion': descripcion
-                    }
-
-            # Color del contorno según la confianza
-            if result["prob"] < 0.85:
-                color = (0, 255, 255)  # amarillo = baja confianza
-                cv2.drawContours(frame, [c], -1, color, 2)
-                continue  # No analizar color
-            else:
-                color = (0, 255, 0)
-                cv2.drawContours(frame, [c], -1, color, 4)
-
-            # Dibujar solo el contorno con grosor aumentado
-            cv2.drawContours(frame, [c], -1, color, 4)
-
-        frame_count += 1
-
-        # Codificar y enviar frame
-        ret, jpeg = cv2.imencode('.jpg', frame)
-        if ret:
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + jpeg.tobytes() + b'\r\n')
 def video_feed(request):
-    """Vista para el streaming de video"""
+    """Vista para el streaming de video de una cámara (?stream=nombre)"""
+    camera = cameras.get(_stream_key(request))
+    if camera is None:
+        return JsonResponse({"success": False, "error": "Cámara no registrada"}, status=404)
+    # Bajo ASGI el stream se sirve con un iterador asíncrono; bajo WSGI, síncrono
+    if isinstance(request, ASGIRequest):
+        stream = agenerate_video(camera)
+    else:
+        stream = generate_video(camera)
     return StreamingHttpResponse(
-        generate_video(),
+        stream,
         content_type='multipart/x-mixed-replace; boundary=frame'
     )
 
 
+def _sse_event(event):
+    data = json.dumps(event, ensure_ascii=False)
+    return f"event: planta\ndata: {data}\n\n".encode()
+
+
+class _PlantEventStream:
+    """
+    Estado de un stream SSE. Si el pipeline corre en este proceso, el
+    broadcaster local despierta al stream al instante; si corre en otro
+    worker, el caché compartido se revisa cada CLASIFICADOR_SSE_SYNC segundos.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.events = result_store.events(stream)
+        self.version = -1
+        self.sent = None
+        self.last_chunk = time.monotonic()
+
+    def next_chunk(self):
+        """Evento si el resultado cambió, ping si toca, o None."""
+        event = snapshot(*result_store.get(self.stream))
+        now = time.monotonic()
+        if event != self.sent:
+            self.sent = event
+            self.last_chunk = now
+            return _sse_event(event)
+        if now - self.last_chunk >= settings.CLASIFICADOR_SSE_PING:
+            # Comentario SSE: mantiene viva la conexión y detecta clientes desconectados
+            self.last_chunk = now
+            return b": ping\n\n"
+        return None
+
+
+async def agenerate_plant_events(stream):
+    """Empuja un evento por cada cambio de resultado; entre cambios, solo un ping."""
+    yield b"retry: 3000\n\n"
+    state = _PlantEventStream(stream)
+    while True:
+        # El caché puede tocar la red: se consulta fuera del event loop
+        chunk = await sync_to_async(state.next_chunk, thread_sensitive=False)()
+        if chunk is not None:
+            yield chunk
+        state.version, _ = await state.events.wait_async(state.version, settings.CLASIFICADOR_SSE_SYNC)
+
+
+def plant_events(request):
+    """
+    Stream SSE con la etiqueta, probabilidad y análisis de color cuando cambian.
+
+    Solo bajo ASGI: con WSGI cada pestaña abierta ocuparía un worker síncrono
+    mientras siga abierta. Bajo WSGI la página de monitoreo sondea
+    /get_plant_data/ y aquí se responde el evento actual y se cierra; un
+    EventSource que llegue igual se reconecta cada 2 s (como el sondeo).
+    """
+    stream = _stream_key(request)
+    if isinstance(request, ASGIRequest):
+        response = StreamingHttpResponse(agenerate_plant_events(stream), content_type='text/event-stream')
+    else:
+        body = b"retry: 2000\n\n" + _sse_event(snapshot(*result_store.get(stream)))
+        response = HttpResponse(body, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Evita que nginx acumule el stream en su buffer
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def analyze_frame(request):
+    """
+    Analiza un frame JPEG capturado en el navegador (cuerpo crudo image/jpeg).
+    ?stream= identifica la cámara del cliente y ?ts= el momento de captura en ms.
+    El frame puede venir reducido: la detección se ajusta a su tamaño.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Método no permitido'}, status=405)
+
+    stream = _stream_key(request)
+    try:
+        timestamp = float(request.GET['ts']) if 'ts' in request.GET else None
+    except ValueError:
+        return JsonResponse({'success': False, 'message': 'ts inválido'}, status=400)
+    if not request.body:
+        return JsonResponse({'success': False, 'message': 'Frame vacío'}, status=400)
+
+    inicio = time.perf_counter()
+    try:
+        # Fuera del event loop y sin el hilo compartido de las vistas síncronas
+        analysis = await sync_to_async(frame_uploads.execute, thread_sensitive=False)(
+            stream, request.body, timestamp
+        )
+    except ValueError as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+
+    if analysis is None:
+        # Llegó otro frame más nuevo: se responde con lo último conocido
+        result, color = await sync_to_async(result_store.get, thread_sensitive=False)(stream)
+        detections = []
+    else:
+        record = await sync_to_async(result_store.update, thread_sensitive=False)(
+            stream, analysis["result"], analysis["color"]
+        )
+        result, color = record["result"], record["color"]
+        detections = [
+            {**d, "bbox": [int(v) for v in d["bbox"]], "prob": float(d["prob"])}
+            for d in analysis["detections"]
+        ]
+
+    return JsonResponse({
+        **snapshot(result, color),
+        "success": True,
+        "procesado": analysis is not None,
+        "ts": timestamp,
+        "detecciones": detections,
+        "latencia_ms": round((time.perf_counter() - inicio) * 1000, 1),
+    })
+
+
 def get_last_result(request):
     """Retorna el último resultado de clasificación"""
-    global last_result
+    last_result, _ = result_store.get(_stream_key(request))
 
     label = str(last_result.get("label", "Detectando..."))
     prob = float(last_result.get("prob", 0.0))
@@ -150,6 +336,66 @@ def get_last_result(request):
     })
 
 
+def video_stats(request):
+    """Espectadores, frames publicados y frames descartados por cada cámara"""
+    stats = {
+        "pipelines": [pipeline.stats() for pipeline in all_pipelines()],
+        "uploads": frame_uploads.stats(),
+    }
+    if inference_scheduler is not None:
+        stats["scheduler"] = inference_scheduler.stats()
+    return JsonResponse(stats)
+
+
+def camera_list(request):
+    """Cámaras registradas en el servidor y si su pipeline está activo"""
+    running = {pipeline.source: pipeline.running for pipeline in all_pipelines()}
+    return JsonResponse({
+        "cameras": [dict(camera.to_dict(), running=running.get(camera.name, False)) for camera in cameras.all()],
+    })
+
+
+def _camera_frames_dropped():
+    dropped = {}
+    for pipeline in all_pipelines():
+        camera = pipeline.camera
+        if camera is not None:
+            dropped[(pipeline.source,)] = camera.frames_dropped
+    return dropped
+
+
+# Valores que ya existen en los pipelines y en el clasificador, leídos al exportar
+REGISTRY.register(Gauge(
+    "leaftech_stream_fps", "Frames publicados por segundo (últimos 10 s)", ("stream",),
+    collect=lambda: {(p.source,): p.fps.rate() for p in all_pipelines()},
+))
+REGISTRY.register(Gauge(
+    "leaftech_stream_subscribers", "Espectadores conectados a cada cámara", ("stream",),
+    collect=lambda: {(p.source,): p.subscribers for p in all_pipelines()},
+))
+REGISTRY.register(Gauge(
+    "leaftech_camera_frames_dropped", "Frames de la cámara descartados sin analizar desde que se abrió", ("stream",),
+    collect=_camera_frames_dropped,
+))
+REGISTRY.register(Gauge(
+    "leaftech_inference_calls_per_second", "Llamadas al modelo por segundo (últimos 10 s)",
+    collect=lambda: {(): model_calls.calls.rate()},
+))
+
+
+def metrics(request):
+    """Métricas de este worker en el formato de texto de Prometheus"""
+    return HttpResponse(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def ready(request):
+    """Readiness: 200 solo cuando el modelo está cargado y calentado"""
+    status = classifier_status()
+    if isinstance(classifier_service, CachedPlantClassifier):
+        status["cache"] = classifier_service.stats()
+    return JsonResponse(status, status=200 if status["ready"] else 503)
+
+
 def index(request):
     """Página principal"""
     return render(request, 'clasificador/index.html')
@@ -157,7 +403,13 @@ def index(request):
 
 def page_1(request):
     """Página de monitoreo"""
-    return render(request, 'clasificador/page1.html')
+    return render(request, 'clasificador/page1.html', {
+        'camara_navegador': settings.CAMARA_NAVEGADOR,
+        'camaras': [camera.name for camera in cameras.all()],
+        'camara': _stream_key(request),
+        # Bajo WSGI un stream SSE ocuparía un worker por pestaña: la página sondea
+        'eventos_sse': isinstance(request, ASGIRequest),
+    })
 
 def get_plant_data(request):
     """
@@ -167,7 +419,7 @@ def get_plant_data(request):
     IMPORTANTE: Solo retorna info de la ESPECIE, no de ejemplares específicos
     Los ejemplares específicos se manejan en las vistas de usuario
     """
-    global last_result, last_color_analysis
+    last_result, last_color_analysis = result_store.get(_stream_key(request))
 
     label = str(last_result.get("label", "Desconocido"))
     prob = float(last_result.get("prob", 0.0))
@@ -0,0 +1,63 @@
+import os
+
+import cv2
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+
+def list_tasks(inputs, chunk=64, step=1):
+    """
+    Divide videos y directorios de imágenes en tareas de a lo sumo `chunk`
+    frames, en orden. Cada tarea es ("video", ruta, primer frame, cantidad)
+    o ("images", ruta del directorio, primer índice, [rutas]); el trabajador
+    lee sus propios frames, así entre procesos solo viajan rutas e índices.
+    """
+    tasks = []
+    for path in inputs:
+        if os.path.isdir(path):
+            images = sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+            )[::step]
+            for start in range(0, len(images), chunk):
+                tasks.append(("images", path, start, images[start:start + chunk]))
+            continue
+
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
+            raise ValueError(f"No se pudo abrir el video: {path}")
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        span = chunk * step
+        for start in range(0, total, span):
+            tasks.append(("video", path, start, min(span, total - start)))
+    return tasks
+
+
+def read_task(task, step=1):
+    """Genera (fuente, índice de frame, tiempo en ms o None, frame BGR) de una tarea."""
+    kind, path, start, payload = task
+    if kind == "images":
+        for offset, image_path in enumerate(payload):
+            frame = cv2.imread(image_path)
+            if frame is not None:
+                yield image_path, start + offset, None, frame
+        return
+
+    cap = cv2.VideoCapture(path)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        if start:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        for index in range(start, start + payload):
+            # grab() sin decodificar los frames que se saltan
+            if (index - start) % step:
+                if not cap.grab():
+                    break
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield path, index, (index * 1000.0 / fps if fps else None), frame
+    finally:
+        cap.release()
@@ -0,0 +1,45 @@
+import pickle
+import threading
+
+import cv2
+import numpy as np
+
+# Tamaño de entrada con el que se entrenó la CNN (ver entrenar_modelo_plantas.py)
+INPUT_SIZE = (128, 128)
+
+
+def load_labels(labels_path):
+    """Carga el pickle de etiquetas y lo invierte a {índice: nombre}."""
+    with open(labels_path, "rb") as f:
+        labels_dict = pickle.load(f)
+    return {v: k for k, v in labels_dict.items()}
+
+
+class BatchBuffer:
+    """
+    Lote uint8 (N, 128, 128, 3) preasignado y reutilizado entre llamadas.
+    cv2.resize escribe cada recorte directamente en su fila; la normalización
+    a [0, 1] ocurre dentro del modelo (capa Rescaling), no en el host.
+    Cada hilo tiene su propio buffer para que las llamadas concurrentes no se pisen.
+    """
+
+    def __init__(self, capacity=8):
+        self.capacity = capacity
+        self._local = threading.local()
+
+    def fill(self, images):
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None or buffer.shape[0] < len(images):
+            size = max(self.capacity, len(images))
+            buffer = np.empty((size, INPUT_SIZE[1], INPUT_SIZE[0], 3), dtype=np.uint8)
+            self._local.buffer = buffer
+        for i, image in enumerate(images):
+            cv2.resize(image, INPUT_SIZE, dst=buffer[i])
+        return buffer[:len(images)]
+
+
+def decode_predictions(pred, labels):
+    """Convierte la salida softmax del modelo en una lista de (nombre, probabilidad)."""
+    idxs = np.argmax(pred, axis=1)
+    probs = np.max(pred, axis=1)
+    return [(labels.get(int(idx), "Desconocido"), prob) for idx, prob in zip(idxs, probs)]
@@ -0,0 +1,328 @@
+"""
+Servicio de inferencia en un proceso aparte.
+
+Un único proceso carga el modelo y atiende a todos los workers web. Los
+recortes viajan por un anillo de memoria compartida (uno por cliente) y por
+el socket solo pasan mensajes de control pequeños: índices de slot y
+resultados. Las peticiones de todos los clientes se agrupan en un mismo lote.
+"""
+import os
+import queue
+import socket
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Client, Listener
+from multiprocessing.shared_memory import SharedMemory
+
+import cv2
+import numpy as np
+
+from clasificador.domain.plant_classifier import PlantClassifierPort
+from clasificador.infraestructure.inference_common import INPUT_SIZE
+
+SLOT_SHAPE = (INPUT_SIZE[1], INPUT_SIZE[0], 3)
+
+
+class SharedFrameRing:
+    """Anillo de slots uint8 de tamaño fijo (entrada del modelo) en memoria compartida."""
+
+    def __init__(self, slots, name=None):
+        size = slots * int(np.prod(SLOT_SHAPE))
+        if name is None:
+            self.shm = SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self.shm = SharedMemory(name=name)
+            # Quien se adjunta no debe borrar el segmento al salir (lo hace el dueño)
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+            self.owner = False
+        self.slots = slots
+        self.array = np.ndarray((slots,) + SLOT_SHAPE, dtype=np.uint8, buffer=self.shm.buf)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        self.array = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # Aún hay vistas vivas (un lote en curso); el mapeo se libera con ellas
+            pass
+        if self.owner:
+            self.shm.unlink()
+
+
+class _ClientConnection:
+    """Estado del servidor para un cliente conectado."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.ring = None
+        self.send_lock = threading.Lock()
+
+    def send(self, message):
+        with self.send_lock:
+            self.conn.send(message)
+
+
+class InferenceServer:
+    """Dueño del modelo: recibe peticiones de todos los clientes y las clasifica por lotes."""
+
+    def __init__(self, classifier, address, authkey, max_batch=32, max_wait=0.002):
+        self.classifier = classifier
+        self.address = address
+        self.authkey = authkey
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.requests = queue.Queue()
+        self.listener = None
+
+    def serve_forever(self):
+        self.listener = Listener(self.address, authkey=self.authkey)
+        threading.Thread(target=self._batch_loop, name="inferencia-lotes", daemon=True).start()
+        try:
+            while True:
+                conn = self.listener.accept()
+                client = _ClientConnection(conn)
+                threading.Thread(target=self._client_loop, args=(client,), daemon=True).start()
+        except OSError:
+            # Listener cerrado desde close()
+            pass
+
+    def close(self):
+        if self.listener is not None:
+            self.listener.close()
+
+    def _client_loop(self, client):
+        try:
+            while True:
+                message = client.conn.recv()
+                kind = message[0]
+                if kind == "attach":
+                    _, name, slots = message
+                    client.ring = SharedFrameRing(slots, name=name)
+                elif kind == "classify":
+                    _, request_id, slots = message
+                    self.requests.put((client, request_id, slots))
+                elif kind == "close":
+                    break
+        except (EOFError, OSError):
+            pass
+        finally:
+            client.conn.close()
+            if client.ring is not None:
+                client.ring.close()
+
+    def _next_batch(self):
+        """Toma la primera petición pendiente y agrega las que lleguen hasta llenar el lote."""
+        pending = [self.requests.get()]
+        count = len(pending[0][2])
+        deadline = time.monotonic() + self.max_wait
+        while count < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self.requests.get(timeout=timeout) if timeout > 0 else self.requests.get_nowait()
+            except queue.Empty:
+                break
+            pending.append(item)
+            count += len(item[2])
+        return pending
+
+    def _batch_loop(self):
+        while True:
+            pending = [p for p in self._next_batch() if p[0].ring is not None and p[0].ring.array is not None]
+            if not pending:
+                continue
+            images = [client.ring.array[slot] for client, _, slots in pending for slot in slots]
+            try:
+                results = self.classifier.classify_batch(images)
+            except Exception as e:
+                for client, request_id, _ in pending:
+                    self._reply(client, ("error", request_id, str(e)))
+                continue
+
+            start = 0
+            for client, request_id, slots in pending:
+                chunk = [(str(label), float(prob)) for label, prob in results[start:start + len(slots)]]
+                start += len(slots)
+                self._reply(client, ("result", request_id, chunk))
+
+    @staticmethod
+    def _reply(client, message):
+        try:
+            client.send(message)
+        except OSError:
+            # El cliente se desconectó; su hilo limpia la conexión
+            pass
+
+
+class RemotePlantClassifier(PlantClassifierPort):
+    """
+    Adaptador cliente: redimensiona los recortes directamente en su anillo de
+    memoria compartida y pide la clasificación al servicio de inferencia.
+    Si el servicio no responde en `timeout` segundos se corta la conexión y la
+    llamada falla con ConnectionError, en vez de bloquear al worker web.
+    """
+
+    def __init__(self, address, authkey, slots=64, retry_interval=2.0, timeout=10.0):
+        self.address = address
+        self.authkey = authkey
+        self.slots = slots
+        self.retry_interval = retry_interval
+        self.timeout = timeout
+        # El anillo se crea recién con la conexión establecida: si el servicio
+        # no responde no queda un segmento de /dev/shm huérfano
+        self.ring = None
+        # Cabeza de escritura y slots libres del anillo; el servidor responde
+        # en orden, así que los slots se liberan en el mismo orden en que se usan
+        self._head = 0
+        self._free = slots
+        self._cond = threading.Condition()
+        self._send_lock = threading.Lock()
+        self._pending = {}
+        self._next_id = 0
+        self._retry_at = 0.0
+        self.conn = None
+        try:
+            self._connect()
+        except BaseException:
+            if self.ring is not None:
+                self.ring.close()
+            raise
+
+    def _connect(self):
+        """Con _cond tomado (o en __init__): conecta y adjunta el anillo al servidor."""
+        now = time.monotonic()
+        if now < self._retry_at:
+            raise ConnectionError("Servicio de inferencia no disponible (reintento en espera)")
+        try:
+            conn = Client(self.address, authkey=self.authkey)
+        except OSError:
+            self._retry_at = now + self.retry_interval
+            raise
+        try:
+            if self.ring is None:
+                self.ring = SharedFrameRing(self.slots)
+            conn.send(("attach", self.ring.name, self.ring.slots))
+        except BaseException:
+            conn.close()
+            raise
+        self.conn = conn
+        threading.Thread(target=self._reader_loop, args=(conn,), name="inferencia-cliente", daemon=True).start()
+
+    def _reader_loop(self, conn):
+        try:
+            while True:
+                kind, request_id, payload = conn.recv()
+                with self._cond:
+                    future, count = self._pending.pop(request_id)
+                    self._free += count
+                    self._cond.notify_all()
+                if kind == "result":
+                    future.set_result(payload)
+                else:
+                    future.set_exception(RuntimeError(f"Servicio de inferencia: {payload}"))
+        except (EOFError, OSError):
+            with self._cond:
+                pending, self._pending = self._pending, {}
+                self._free = self.slots
+                if self.conn is conn:
+                    self.conn = None
+                self._cond.notify_all()
+            conn.close()
+            for future, _ in pending.values():
+                future.set_exception(ConnectionError("Se perdió la conexión con el servicio de inferencia"))
+
+    def _submit(self, images):
+        """Escribe hasta `slots` recortes en el anillo y envía la petición."""
+        count = len(images)
+        # Reservar y enviar bajo el mismo candado: el orden de envío es el
+        # orden del anillo, y el servidor responde (y libera) en ese orden
+        with self._send_lock:
+            with self._cond:
+                if self.conn is None:
+                    self._connect()
+                conn = self.conn
+                while self._free < count and self.conn is conn:
+                    self._cond.wait()
+                # _reader_loop pudo perder la conexión mientras se esperaba un slot
+                if self.conn is not conn:
+                    raise ConnectionError("Se perdió la conexión con el servicio de inferencia")
+                start = self._head
+                slots = [(start + i) % self.ring.slots for i in range(count)]
+                self._head = (start + count) % self.ring.slots
+                self._free -= count
+                request_id = self._next_id
+                self._next_id += 1
+                future = Future()
+                self._pending[request_id] = (future, count)
+
+            try:
+                for slot, image in zip(slots, images):
+                    cv2.resize(image, INPUT_SIZE, dst=self.ring.array[slot])
+                conn.send(("classify", request_id, slots))
+            except BaseException as e:
+                with self._cond:
+                    # Si _reader_loop ya la tomó, la petición falló y el anillo se reinició
+                    owned = self._pending.pop(request_id, None) is not None
+                    if owned:
+                        # Nadie reservó después (_send_lock): se deshace la reserva
+                        self._free += count
+                        self._head = start
+                        self._cond.notify_all()
+                if not isinstance(e, OSError):
+                    raise
+                if owned:
+                    future.set_exception(ConnectionError(f"No se pudo enviar la petición al servicio de inferencia: {e}"))
+        return future
+
+    @staticmethod
+    def _drop(conn):
+        """Corta la conexión: _reader_loop despierta con EOF y falla las peticiones pendientes."""
+        try:
+            with socket.socket(fileno=os.dup(conn.fileno())) as sock:
+                sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def classify(self, image):
+        return self.classify_batch([image])[0]
+
+    def classify_batch(self, images):
+        if len(images) == 0:
+            return []
+        futures = [
+            self._submit(images[i:i + self.slots])
+            for i in range(0, len(images), self.slots)
+        ]
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        results = []
+        for future in futures:
+            try:
+                chunk = future.result(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                # Servicio colgado: sin la conexión sus slots vuelven al anillo
+                with self._cond:
+                    conn = self.conn
+                if conn is not None:
+                    self._drop(conn)
+                raise ConnectionError(f"El servicio de inferencia no respondió en {self.timeout} s") from None
+            results.extend(chunk)
+        return results
+
+    def close(self):
+        # _reader_loop puede poner self.conn en None en cualquier momento
+        with self._cond:
+            conn, self.conn = self.conn, None
+        if conn is not None:
+            try:
+                conn.send(("close",))
+            except OSError:
+                pass
+            conn.close()
+        if self.ring is not None:
+            self.ring.close()
@@ -0,0 +1,75 @@
+import time
+
+from clasificador.domain.color_analizer import ColorAnalyzer
+from clasificador.domain.leaf_detector import LeafDetector
+from clasificador.domain.plant_classifier import PlantClassifierPort
+from clasificador.infraestructure.metrics import (
+    INFERENCE_CALLS, INFERENCE_IMAGES, STAGE_SECONDS, RateMeter,
+)
+
+# Series resueltas una sola vez: observar no busca etiquetas en cada frame
+_RESIZE = STAGE_SECONDS.labels("resize")
+_SEGMENT = STAGE_SECONDS.labels("hsv_morphology")
+_CONTOURS = STAGE_SECONDS.labels("contours")
+_FILTER = STAGE_SECONDS.labels("filter")
+_CLASSIFY = STAGE_SECONDS.labels("classify")
+_COLOR = STAGE_SECONDS.labels("color")
+_CALLS = INFERENCE_CALLS.labels()
+_IMAGES = INFERENCE_IMAGES.labels()
+
+
+class TimedLeafDetector(LeafDetector):
+    """LeafDetector que registra el tiempo de cada etapa de la búsqueda en /metrics."""
+
+    def detect(self, frame):
+        t0 = time.perf_counter()
+        small = self.resize(frame)
+        t1 = time.perf_counter()
+        hsv, mask = self.segment(small)
+        t2 = time.perf_counter()
+        contours = self.find_contours(mask)
+        t3 = time.perf_counter()
+        candidates = self.filter(contours, hsv, frame.shape)
+        t4 = time.perf_counter()
+        _RESIZE.observe(t1 - t0)
+        _SEGMENT.observe(t2 - t1)
+        _CONTOURS.observe(t3 - t2)
+        _FILTER.observe(t4 - t3)
+        return candidates
+
+
+class TimedColorAnalyzer(ColorAnalyzer):
+    """ColorAnalyzer que registra el tiempo de detectar_colores_frame en /metrics."""
+
+    def detectar_colores_frame(self, frame):
+        inicio = time.perf_counter()
+        try:
+            return super().detectar_colores_frame(frame)
+        finally:
+            _COLOR.observe(time.perf_counter() - inicio)
+
+
+class TimedPlantClassifier(PlantClassifierPort):
+    """
+    Decorador del puerto que registra cada llamada al modelo: duración,
+    recortes por llamada y llamadas por segundo.
+    """
+
+    def __init__(self, classifier):
+        self.classifier = classifier
+        self.calls = RateMeter()
+
+    def classify(self, image):
+        return self.classify_batch([image])[0]
+
+    def classify_batch(self, images):
+        if len(images) == 0:
+            return []
+        inicio = time.perf_counter()
+        try:
+            return self.classifier.classify_batch(images)
+        finally:
+            _CLASSIFY.observe(time.perf_counter() - inicio)
+            _CALLS.inc()
+            _IMAGES.inc(len(images))
+            self.calls.mark()
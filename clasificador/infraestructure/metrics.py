@@ -0,0 +1,223 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Límites (segundos) de los histogramas de tiempo: de 0.1 ms a 2.5 s
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """Serie hija para estos valores de etiqueta (se crea la primera vez)."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """Contador monótono; Prometheus calcula la tasa con rate()."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def _render_child(self, key, child):
+        yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - inicio)
+
+
+class Histogram(_Metric):
+    """
+    Histograma de duraciones. Observar cuesta una búsqueda binaria y una
+    suma bajo candado; los acumulados por límite se calculan al exportar.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def _render_child(self, key, child):
+        with child._lock:
+            counts = list(child.counts)
+            total = child.sum
+        cumulative = 0
+        for le, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, [("le", _format_value(le))])
+            yield f"{self.name}_bucket{labels} {cumulative}"
+        labels = _format_labels(self.labelnames, key)
+        yield f"{self.name}_sum{labels} {_format_value(total)}"
+        yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Gauge(_Metric):
+    """
+    Valor instantáneo calculado al exportar: `collect` devuelve
+    {(valores de etiqueta,): valor}. Sirve para leer estado que ya existe
+    (frames descartados de cada cámara, espectadores) sin duplicarlo.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, help, labelnames=(), collect=None):
+        super().__init__(name, help, labelnames)
+        self.collect = collect
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted((self.collect() or {}).items()):
+            key = tuple(str(v) for v in key)
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class RateMeter:
+    """Eventos por segundo en una ventana deslizante de `window` segundos (cubetas de 1 s)."""
+
+    def __init__(self, window=10, clock=time.monotonic):
+        self.window = window
+        self.clock = clock
+        self._counts = [0] * window
+        self._seconds = [None] * window
+        self._lock = threading.Lock()
+
+    def mark(self, count=1):
+        second = int(self.clock())
+        i = second % self.window
+        with self._lock:
+            if self._seconds[i] != second:
+                self._seconds[i] = second
+                self._counts[i] = 0
+            self._counts[i] += count
+
+    def rate(self):
+        # Solo segundos completos: el actual todavía se está llenando
+        now = int(self.clock())
+        with self._lock:
+            total = sum(
+                count for second, count in zip(self._seconds, self._counts)
+                if second is not None and 0 < now - second <= self.window - 1
+            )
+        return total / (self.window - 1)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Registra `metric` (o devuelve la ya registrada con ese nombre)."""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def render(self):
+        """Todas las métricas en el formato de texto de Prometheus."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Métricas del proceso. Con varios workers cada uno exporta las suyas
+# (las de una cámara, en el worker que tiene su pipeline)
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "leaftech_stage_seconds",
+    "Tiempo de cada etapa del análisis (detección, clasificación, color)",
+    ("stage",),
+))
+STREAM_STAGE_SECONDS = REGISTRY.register(Histogram(
+    "leaftech_stream_stage_seconds",
+    "Tiempo de cada etapa del pipeline de una cámara (captura, análisis, codificación)",
+    ("stream", "stage"),
+))
+FRAMES_PUBLISHED = REGISTRY.register(Counter(
+    "leaftech_frames_published_total",
+    "Frames analizados y publicados por cada cámara",
+    ("stream",),
+))
+INFERENCE_CALLS = REGISTRY.register(Counter(
+    "leaftech_inference_calls_total",
+    "Llamadas al modelo (cada una es un lote de recortes)",
+))
+INFERENCE_IMAGES = REGISTRY.register(Counter(
+    "leaftech_inference_images_total",
+    "Recortes clasificados por el modelo",
+))
@@ -0,0 +1,182 @@
+import os
+import shutil
+import threading
+import time
+
+from clasificador.domain.plant_classifier import PlantClassifierPort
+
+ACTIVE_FILE = "ACTIVE"
+HISTORY_FILE = "HISTORY"
+LABELS_FILE = "labels.pkl"
+MODEL_NAMES = ("modelo.h5", "modelo.keras", "modelo.tflite")
+
+
+def _write_atomic(path, content):
+    """Escribe el archivo completo o nada: los lectores nunca ven un puntero a medias."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+class ModelRegistry:
+    """
+    Directorio de modelos versionados:
+
+        modelos/
+            v5/modelo.h5, v5/labels.pkl
+            v6/modelo.h5, v6/labels.pkl
+            ACTIVE      -> "v6"
+            HISTORY     -> versiones activadas antes, una por línea
+    """
+
+    def __init__(self, root):
+        self.root = str(root)
+
+    def exists(self):
+        return os.path.exists(os.path.join(self.root, ACTIVE_FILE))
+
+    def versions(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if os.path.isdir(os.path.join(self.root, name))
+        )
+
+    def active_version(self):
+        try:
+            with open(os.path.join(self.root, ACTIVE_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def history(self):
+        try:
+            with open(os.path.join(self.root, HISTORY_FILE)) as f:
+                return [line.strip() for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def paths(self, version):
+        """Devuelve (modelo, etiquetas) de una versión."""
+        directory = os.path.join(self.root, version)
+        for name in MODEL_NAMES:
+            model_path = os.path.join(directory, name)
+            if os.path.exists(model_path):
+                return model_path, os.path.join(directory, LABELS_FILE)
+        raise FileNotFoundError(f"La versión {version!r} no tiene modelo en {directory}")
+
+    def add(self, version, model_path, labels_path):
+        """Copia un modelo y sus etiquetas al registro como una nueva versión."""
+        directory = os.path.join(self.root, version)
+        if os.path.exists(directory):
+            raise ValueError(f"La versión {version!r} ya existe")
+        extension = os.path.splitext(model_path)[1]
+        os.makedirs(directory)
+        shutil.copy2(model_path, os.path.join(directory, f"modelo{extension}"))
+        shutil.copy2(labels_path, os.path.join(directory, LABELS_FILE))
+        self.paths(version)
+
+    def activate(self, version):
+        """Apunta ACTIVE a otra versión y guarda la anterior para poder volver."""
+        self.paths(version)
+        previous = self.active_version()
+        if previous == version:
+            return
+        if previous:
+            _write_atomic(os.path.join(self.root, HISTORY_FILE), "\n".join(self.history() + [previous]) + "\n")
+        _write_atomic(os.path.join(self.root, ACTIVE_FILE), version + "\n")
+
+    def rollback(self):
+        """Vuelve a la versión activa anterior."""
+        history = self.history()
+        if not history:
+            raise ValueError("No hay una versión anterior a la cual volver")
+        version = history.pop()
+        self.paths(version)
+        _write_atomic(os.path.join(self.root, HISTORY_FILE), "".join(f"{v}\n" for v in history))
+        _write_atomic(os.path.join(self.root, ACTIVE_FILE), version + "\n")
+        return version
+
+
+class HotSwapPlantClassifier(PlantClassifierPort):
+    """
+    Sigue el puntero ACTIVE del registro. Cuando cambia, carga y calienta la
+    nueva versión en segundo plano y la intercambia de forma atómica; las
+    peticiones en curso terminan con el modelo anterior.
+
+    Una versión que no carga no se vuelve a intentar: se sigue con el modelo
+    que ya funcionaba o, al arrancar, con la última versión de HISTORY que sí
+    cargue.
+    """
+
+    def __init__(self, registry, loader, poll_interval=5.0):
+        self.registry = registry
+        self.loader = loader
+        self.poll_interval = poll_interval
+        self._failed = set()
+        # (versión, clasificador) se reemplaza como una sola referencia
+        self._current = self._load_initial()
+        self._loading = None
+        self._lock = threading.Lock()
+        self._next_check = time.monotonic() + poll_interval
+
+    def _load_initial(self):
+        active = self.registry.active_version()
+        # La activa primero y después las anteriores, de la más reciente a la más vieja
+        candidates = dict.fromkeys(v for v in [active] + self.registry.history()[::-1] if v)
+        errors = []
+        for version in candidates:
+            try:
+                classifier = self.loader(*self.registry.paths(version))
+            except Exception as e:
+                print(f"❌ Error al cargar el modelo {version}: {e}")
+                self._failed.add(version)
+                errors.append(f"{version}: {e}")
+                continue
+            if version != active:
+                print(f"⚠️ Modelo {active} no disponible, se usa {version}")
+            return version, classifier
+        raise RuntimeError("Ninguna versión del registro se pudo cargar (" + "; ".join(errors) + ")")
+
+    @property
+    def version(self):
+        return self._current[0]
+
+    def _check_pointer(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.poll_interval
+
+        version = self.registry.active_version()
+        if not version or version == self._current[0] or version in self._failed:
+            return
+        with self._lock:
+            if self._loading is not None:
+                return
+            self._loading = version
+        threading.Thread(target=self._swap, args=(version,), name=f"modelo-{version}", daemon=True).start()
+
+    def _swap(self, version):
+        try:
+            # El constructor del adaptador ya calienta el modelo
+            classifier = self.loader(*self.registry.paths(version))
+            self._current = (version, classifier)
+            print(f"✅ Modelo {version} activo")
+        except Exception as e:
+            # Sigue el modelo anterior; esta versión no se reintenta en cada sondeo
+            self._failed.add(version)
+            print(f"❌ Error al cargar el modelo {version}: {e}")
+        finally:
+            with self._lock:
+                self._loading = None
+
+    def classify(self, image):
+        return self.classify_batch([image])[0]
+
+    def classify_batch(self, images):
+        self._check_pointer()
+        _, classifier = self._current
+        return classifier.classify_batch(images)
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+
+
+def snapshot(result, color):
+    """
+    Evento compacto con lo que muestra la página de monitoreo. Los valores se
+    redondean a lo que se ve en pantalla, así el ruido de la probabilidad
+    suavizada no genera eventos que no cambian nada.
+    """
+    return {
+        "label": str(result.get("label", "Detectando...")),
+        "prob": round(float(result.get("prob", 0.0)), 3),
+        "porcentaje_verde": round(float(color['verde']), 1),
+        "porcentaje_amarillo": round(float(color['amarillo']), 1),
+        "porcentaje_marron": round(float(color['marron']), 1),
+        "porcentaje_rojo": round(float(color['rojo']), 1),
+        "estado": color['estado'],
+        "descripcion_estado": color['descripcion'],
+    }
+
+
+class ResultBroadcaster:
+    """
+    Último resultado publicado, con un número de versión que solo avanza
+    cuando el evento cambia. Los streams SSE (solo bajo ASGI) esperan a una
+    versión nueva desde el event loop; publish() puede llamarse desde
+    cualquier hilo.
+    """
+
+    def __init__(self, initial):
+        self.current = initial
+        self.version = 0
+        self._lock = threading.Lock()
+        self._waiters = set()
+
+    def publish(self, event):
+        """Devuelve True si el evento era distinto del actual."""
+        with self._lock:
+            if event == self.current:
+                return False
+            self.current = event
+            self.version += 1
+            for loop, waiter in list(self._waiters):
+                try:
+                    loop.call_soon_threadsafe(waiter.set)
+                except RuntimeError:
+                    # El event loop ya se cerró
+                    self._waiters.discard((loop, waiter))
+            return True
+
+    async def wait_async(self, since, timeout):
+        """Espera una versión posterior a `since`; devuelve (versión, evento)."""
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            if self.version > since:
+                return self.version, self.current
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+        with self._lock:
+            return self.version, self.current
@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+import uuid
+
+from django.core.cache.backends.locmem import LocMemCache
+
+from clasificador.infraestructure.result_events import ResultBroadcaster, snapshot
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULT = {"label": "Detectando...", "prob": 0.0}
+DEFAULT_COLOR = {
+    'verde': 0,
+    'amarillo': 0,
+    'marron': 0,
+    'rojo': 0,
+    'estado': 0,
+    'descripcion': 'Analizando...'
+}
+
+
+class DetectionResultStore:
+    """
+    Último resultado de detección por stream, compartido entre workers a
+    través del caché de Django.
+
+    Resultado y color se guardan en claves separadas y cada uno solo se
+    escribe cuando llega: un frame sin hoja (sin resultado) o sin análisis
+    de color no pisa lo que escribió otro worker. Así un stream puede tener
+    varios escritores (los frames del navegador llegan a cualquier worker).
+    Cada escritura compara contra lo que hay en el caché compartido, no
+    contra lo que escribió este proceso. Las entradas caducan a los `ttl`
+    segundos: si el stream se detiene, los lectores vuelven a "Detectando...".
+    Si el caché compartido falla, se usa memoria local del proceso.
+    """
+
+    FIELDS = ("result", "color")
+    DEFAULTS = {"result": DEFAULT_RESULT, "color": DEFAULT_COLOR}
+
+    def __init__(self, cache, ttl=10.0, prefix="clasificador:resultado"):
+        self.cache = cache
+        self.ttl = ttl
+        self.prefix = prefix
+        self.fallback = LocMemCache("clasificador-resultados", {})
+        self._lock = threading.Lock()
+        self._written_at = {}
+        self._events = {}
+
+    def _key(self, stream, field):
+        return f"{self.prefix}:{stream}:{field}"
+
+    def _read(self, stream):
+        """Valores compartidos del stream, con los de por defecto para lo que falte."""
+        keys = {field: self._key(stream, field) for field in self.FIELDS}
+        try:
+            found = self.cache.get_many(keys.values())
+        except Exception as e:
+            logger.warning("Caché de resultados no disponible, se usa memoria local: %s", e)
+            found = self.fallback.get_many(keys.values())
+        return {field: found.get(key, self.DEFAULTS[field]) for field, key in keys.items()}
+
+    def _write(self, stream, values):
+        data = {self._key(stream, field): value for field, value in values.items()}
+        try:
+            self.cache.set_many(data, self.ttl)
+        except Exception as e:
+            logger.warning("Caché de resultados no disponible, se usa memoria local: %s", e)
+        # La copia local responde aunque el caché compartido esté caído
+        self.fallback.set_many(data, self.ttl)
+
+    def get(self, stream):
+        """Devuelve (resultado, análisis de color) del stream."""
+        record = self._read(stream)
+        return dict(record["result"]), dict(record["color"])
+
+    def update(self, stream, result=None, color=None):
+        """
+        Escribe `result` y/o `color` (los None no se tocan) y devuelve el
+        registro actual {"result": ..., "color": ...}. Solo escribe en el
+        caché si cambió lo que se ve en pantalla respecto del registro
+        compartido, o si este proceso escribió ese campo hace más de ttl/2
+        (para que no caduque); si cambió, despierta a los streams SSE locales.
+        """
+        incoming = {field: value for field, value in (("result", result), ("color", color)) if value is not None}
+        with self._lock:
+            previous = self._read(stream)
+            record = {**previous, **incoming}
+            changed = (snapshot(record["result"], record["color"])
+                       != snapshot(previous["result"], previous["color"]))
+            now = time.monotonic()
+            pending = {
+                field: value for field, value in incoming.items()
+                if changed or now - self._written_at.get((stream, field), 0.0) >= self.ttl / 2
+            }
+            if pending:
+                self._write(stream, pending)
+                for field in pending:
+                    self._written_at[(stream, field)] = now
+        if changed:
+            self.events(stream).publish(snapshot(record["result"], record["color"]))
+        return record
+
+    def events(self, stream):
+        """Broadcaster local del stream (despierta a los SSE de este proceso)."""
+        with self._lock:
+            events = self._events.get(stream)
+            if events is None:
+                events = ResultBroadcaster(snapshot(DEFAULT_RESULT, DEFAULT_COLOR))
+                self._events[stream] = events
+            return events
+
+
+class StreamLease:
+    """
+    Marca compartida de "stream en análisis" para LatestFrameAnalysisUseCase:
+    un solo worker analiza a la vez los frames de un stream. `cache.add` es
+    atómico en Redis; en el caché de archivos deja una ventana mínima en la
+    que dos workers podrían tomarla. La marca caduca a los `ttl` segundos
+    por si el worker que la tenía muere a mitad de un análisis.
+    """
+
+    def __init__(self, cache, ttl=5.0, prefix="clasificador:analizando"):
+        self.cache = cache
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _key(self, stream):
+        return f"{self.prefix}:{stream}"
+
+    def acquire(self, stream):
+        """Devuelve un token si este proceso tomó el stream, o None si lo tiene otro."""
+        token = uuid.uuid4().hex
+        try:
+            return token if self.cache.add(self._key(stream), token, self.ttl) else None
+        except Exception as e:
+            # Sin caché compartido queda solo el límite dentro de cada proceso
+            logger.warning("Caché de resultados no disponible, análisis sin marca compartida: %s", e)
+            return token
+
+    def release(self, stream, token):
+        try:
+            if self.cache.get(self._key(stream)) == token:
+                self.cache.delete(self._key(stream))
+        except Exception as e:
+            logger.warning("No se pudo liberar la marca de análisis de %s: %s", stream, e)
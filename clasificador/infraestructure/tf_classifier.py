@@ -1,23 +1,46 @@
-import cv2
-import numpy as np
 import tensorflow as tf
-import pickle
 from clasificador.domain.plant_classifier import PlantClassifierPort
+from clasificador.infraestructure.inference_common import INPUT_SIZE, BatchBuffer, decode_predictions, load_labels
+
+# Firma fija (lote x 128 x 128 x 3) en uint8: el grafo se traza una sola vez
+INPUT_SIGNATURE = [tf.TensorSpec(shape=(None, INPUT_SIZE[1], INPUT_SIZE[0], 3), dtype=tf.uint8)]
+
+
+def with_uint8_input(model):
+    """
+    Antepone la normalización (x / 255) al modelo para que reciba píxeles uint8,
+    igual que el rescale=1./255 usado en entrenar_modelo_plantas.py.
+    """
+    inputs = tf.keras.Input(shape=(INPUT_SIZE[1], INPUT_SIZE[0], 3), dtype="uint8")
+    x = tf.keras.layers.Rescaling(1. / 255)(inputs)
+    return tf.keras.Model(inputs, model(x))
+
 
 class TensorflowPlantClassifier(PlantClassifierPort):
     """Adaptador que conecta el dominio con TensorFlow."""
 
     def __init__(self, model_path, labels_path):
-        self.model = tf.keras.models.load_model(model_path)
-        with open(labels_path, "rb") as f:
-            labels_dict = pickle.load(f)
-        self.labels = {v: k for k, v in labels_dict.items()}
+        self.model = with_uint8_input(tf.keras.models.load_model(model_path))
+        self.labels = load_labels(labels_path)
+        self.buffer = BatchBuffer()
+        # Llamada compilada en lugar de model.predict, que arma un adaptador
+        # de datos y callbacks en cada invocación
+        self._infer = tf.function(self._forward, input_signature=INPUT_SIGNATURE)
+        self.warmup()
+
+    def _forward(self, batch):
+        return self.model(batch, training=False)
+
+    def warmup(self):
+        """Traza el grafo con un tensor vacío para que el primer frame no pague ese costo."""
+        self._infer(tf.zeros((1, INPUT_SIZE[1], INPUT_SIZE[0], 3), dtype=tf.uint8))
 
     def classify(self, image):
-        img = cv2.resize(image, (128, 128))
-        img = img.astype("float32") / 255.0
-        img = np.expand_dims(img, axis=0)
-        pred = self.model.predict(img, verbose=0)
-        idx = np.argmax(pred)
-        prob = np.max(pred)
-        return self.labels.get(idx, "Desconocido"), prob
\ No newline at end of file
+        return self.classify_batch([image])[0]
+
+    def classify_batch(self, images):
+        """Clasifica todas las imágenes en una sola pasada del modelo."""
+        if len(images) == 0:
+            return []
+        pred = self._infer(self.buffer.fill(images)).numpy()
+        return decode_predictions(pred, self.labels)
@@ -0,0 +1,139 @@
+import os
+import threading
+
+import numpy as np
+
+from clasificador.domain.plant_classifier import PlantClassifierPort
+from clasificador.infraestructure.inference_common import INPUT_SIZE, BatchBuffer, decode_predictions, load_labels
+
+try:
+    # Runtime ligero (sin TensorFlow completo) para producción
+    from tflite_runtime.interpreter import Interpreter, OpResolverType
+except ImportError:
+    Interpreter = None
+    OpResolverType = None
+
+
+def convert_to_tflite(model_path, tflite_path=None):
+    """
+    Convierte el modelo Keras (.h5) a .tflite y lo guarda junto al original.
+    Si el .tflite ya existe y es más reciente que el .h5, se reutiliza.
+    El modelo exportado recibe píxeles uint8 (la normalización va en el grafo).
+    """
+    if model_path.endswith(".tflite"):
+        # Ya es un modelo exportado (p. ej. una variante cuantizada)
+        return model_path
+
+    if tflite_path is None:
+        tflite_path = os.path.splitext(model_path)[0] + "_uint8.tflite"
+
+    if os.path.exists(tflite_path) and (
+        not os.path.exists(model_path)
+        or os.path.getmtime(tflite_path) >= os.path.getmtime(model_path)
+    ):
+        return tflite_path
+
+    # TensorFlow solo se necesita para convertir, no para ejecutar
+    import tensorflow as tf
+    from clasificador.infraestructure.tf_classifier import with_uint8_input
+
+    model = with_uint8_input(tf.keras.models.load_model(model_path))
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    tflite_model = converter.convert()
+
+    # Escritura atómica para que otro worker nunca lea un archivo a medias
+    tmp_path = f"{tflite_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(tflite_model)
+    os.replace(tmp_path, tflite_path)
+    return tflite_path
+
+
+def _create_interpreter(tflite_path, num_threads):
+    """
+    Crea el intérprete con el resolver AUTO, que aplica el delegado XNNPACK
+    por defecto en CPU.
+    """
+    if Interpreter is not None:
+        return Interpreter(
+            model_path=tflite_path,
+            num_threads=num_threads,
+            experimental_op_resolver_type=OpResolverType.AUTO,
+        )
+
+    import tensorflow as tf
+
+    return tf.lite.Interpreter(
+        model_path=tflite_path,
+        num_threads=num_threads,
+        experimental_op_resolver_type=tf.lite.experimental.OpResolverType.AUTO,
+    )
+
+
+def prepare_input(pixels, input_details):
+    """
+    Adapta el lote uint8 al tensor de entrada del modelo:
+    - uint8 sin cuantización: la normalización está en el grafo, se pasa tal cual.
+    - float32 (modelos exportados antes de incluir la normalización): x / 255.
+    - int8/uint8 cuantizado sobre [0, 1]: se cuantiza con su escala y punto cero.
+    """
+    dtype = input_details["dtype"]
+    scale, zero_point = input_details["quantization"]
+    if dtype == pixels.dtype and scale == 0:
+        return pixels
+    normalized = pixels.astype(np.float32) / 255.0
+    if dtype == np.float32:
+        return normalized
+    info = np.iinfo(dtype)
+    return np.clip(np.round(normalized / scale + zero_point), info.min, info.max).astype(dtype)
+
+
+def dequantize_output(pred, output_details):
+    """Convierte la salida cuantizada del modelo de vuelta a probabilidades float32."""
+    if output_details["dtype"] == np.float32:
+        return pred
+    scale, zero_point = output_details["quantization"]
+    return (pred.astype(np.float32) - zero_point) * scale
+
+
+class TFLitePlantClassifier(PlantClassifierPort):
+    """Adaptador que ejecuta el modelo con el intérprete TFLite + XNNPACK."""
+
+    def __init__(self, model_path, labels_path, num_threads=None):
+        self.tflite_path = convert_to_tflite(model_path)
+        self.num_threads = num_threads or os.cpu_count() or 1
+        self.interpreter = _create_interpreter(self.tflite_path, self.num_threads)
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()[0]
+        self.output_details = self.interpreter.get_output_details()[0]
+        self.input_index = self.input_details["index"]
+        self.output_index = self.output_details["index"]
+        self.batch_size = 1
+        self.buffer = BatchBuffer()
+        self.labels = load_labels(labels_path)
+        # El intérprete no es reentrante: los hilos del servidor se turnan
+        self._lock = threading.Lock()
+        self.warmup()
+
+    def warmup(self):
+        """Primera invocación con un recorte vacío (XNNPACK prepara sus buffers aquí)."""
+        self.classify(np.zeros((INPUT_SIZE[1], INPUT_SIZE[0], 3), dtype=np.uint8))
+
+    def classify(self, image):
+        return self.classify_batch([image])[0]
+
+    def classify_batch(self, images):
+        """Clasifica todas las imágenes en una sola invocación del intérprete."""
+        if len(images) == 0:
+            return []
+        batch = prepare_input(self.buffer.fill(images), self.input_details)
+        with self._lock:
+            if batch.shape[0] != self.batch_size:
+                # Solo se re-asignan tensores cuando cambia el tamaño del lote
+                self.interpreter.resize_tensor_input(self.input_index, batch.shape)
+                self.interpreter.allocate_tensors()
+                self.batch_size = batch.shape[0]
+            self.interpreter.set_tensor(self.input_index, batch)
+            self.interpreter.invoke()
+            pred = self.interpreter.get_tensor(self.output_index)
+        return decode_predictions(dequantize_output(pred, self.output_details), self.labels)
@@ -0,0 +1,261 @@
+import asyncio
+import threading
+import time
+
+import cv2
+
+from clasificador.infraestructure.metrics import FRAMES_PUBLISHED, STREAM_STAGE_SECONDS, RateMeter
+
+
+class Subscription:
+    """Un espectador del pipeline: itera sobre los JPEG más recientes publicados."""
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.closed = False
+        self._seen = pipeline._seq
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        pipeline = self.pipeline
+        with pipeline._cond:
+            pipeline._cond.wait_for(
+                lambda: self.closed or pipeline._seq > self._seen or not pipeline._running
+            )
+            if self.closed or pipeline._seq <= self._seen:
+                raise StopIteration
+            # Un espectador lento salta directo al frame más nuevo
+            self._seen = pipeline._seq
+            return pipeline._jpeg
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.pipeline._unsubscribe()
+
+
+class AsyncSubscription:
+    """
+    Igual que Subscription pero como iterador asíncrono: el espectador espera
+    en el event loop sin ocupar un hilo; el hilo del pipeline lo despierta.
+    """
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.closed = False
+        self._seen = pipeline._seq
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+
+    def _wake(self):
+        """Llamado desde el hilo del pipeline."""
+        try:
+            self._loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:
+            # El event loop ya se cerró
+            pass
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        pipeline = self.pipeline
+        while True:
+            # Limpiar antes de revisar: una publicación posterior vuelve a activar el evento
+            self._event.clear()
+            with pipeline._cond:
+                if not self.closed and pipeline._seq > self._seen:
+                    self._seen = pipeline._seq
+                    return pipeline._jpeg
+                if self.closed or not pipeline._running:
+                    raise StopAsyncIteration
+            await self._event.wait()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.pipeline._unsubscribe(self)
+            self._wake()
+
+
+class VideoPipeline:
+    """
+    Un único pipeline de captura + análisis por cámara, compartido por todos
+    los espectadores. Arranca con el primer suscriptor y, cuando se va el
+    último, libera la cámara tras `idle_timeout` segundos sin espectadores.
+    `on_stop` se llama cada vez que el hilo se detiene (también si la cámara
+    falla), antes de que un arranque posterior vuelva a llamar a analyzer_factory.
+    """
+
+    def __init__(self, source, camera_factory, analyzer_factory, on_analysis=None, idle_timeout=2.0,
+                 on_stop=None):
+        self.source = source
+        self.camera_factory = camera_factory
+        self.analyzer_factory = analyzer_factory
+        self.on_analysis = on_analysis
+        self.on_stop = on_stop
+        self.idle_timeout = idle_timeout
+        self.camera = None
+        self.analyzer = None
+        self.frames_published = 0
+        self.fps = RateMeter()
+        self._cond = threading.Condition()
+        self._subscribers = 0
+        self._async_subscribers = set()
+        self._running = False
+        self._thread = None
+        self._seq = 0
+        self._jpeg = None
+
+    def subscribe(self):
+        with self._cond:
+            self._start()
+            return Subscription(self)
+
+    def subscribe_async(self):
+        """Suscripción para vistas asíncronas (ASGI); debe llamarse dentro del event loop."""
+        with self._cond:
+            self._start()
+            subscription = AsyncSubscription(self)
+            self._async_subscribers.add(subscription)
+            return subscription
+
+    def _start(self):
+        """Con el candado tomado: registra un espectador y arranca el hilo si hace falta."""
+        self._subscribers += 1
+        if not self._running:
+            self._running = True
+            # Si un hilo anterior aún está liberando la cámara, el nuevo lo espera
+            previous = self._thread
+            self._thread = threading.Thread(
+                target=self._run, args=(previous,), name=f"pipeline-{self.source}", daemon=True
+            )
+            self._thread.start()
+
+    def _unsubscribe(self, subscription=None):
+        with self._cond:
+            self._subscribers -= 1
+            self._async_subscribers.discard(subscription)
+            self._cond.notify_all()
+
+    def _notify(self):
+        """Con el candado tomado: despierta a los espectadores síncronos y asíncronos."""
+        self._cond.notify_all()
+        for subscription in self._async_subscribers:
+            subscription._wake()
+
+    @property
+    def subscribers(self):
+        return self._subscribers
+
+    @property
+    def running(self):
+        return self._running
+
+    def _should_stop(self, idle_since):
+        """Con el candado tomado: detener si lleva `idle_timeout` segundos sin espectadores."""
+        if self._subscribers > 0:
+            return False, None
+        idle_since = idle_since or time.monotonic()
+        if time.monotonic() - idle_since >= self.idle_timeout:
+            self._running = False
+            return True, idle_since
+        return False, idle_since
+
+    def _run(self, previous):
+        if previous is not None:
+            previous.join()
+        camera = None
+        try:
+            camera = self.camera_factory(self.source)
+            self.camera = camera
+            analyzer = self.analyzer_factory()
+            self.analyzer = analyzer
+            stream = str(self.source)
+            capture_seconds = STREAM_STAGE_SECONDS.labels(stream, "capture")
+            analyze_seconds = STREAM_STAGE_SECONDS.labels(stream, "analyze")
+            encode_seconds = STREAM_STAGE_SECONDS.labels(stream, "encode")
+            published = FRAMES_PUBLISHED.labels(stream)
+            idle_since = None
+            while True:
+                with self._cond:
+                    stop, idle_since = self._should_stop(idle_since)
+                    if stop:
+                        return
+                    idle = self._subscribers == 0
+
+                # Captura = espera hasta tener un frame nuevo de la cámara
+                t0 = time.perf_counter()
+                ret, frame = camera.read()
+                if not ret:
+                    break
+                if idle:
+                    # Sin espectadores no se analiza ni se codifica
+                    continue
+                t1 = time.perf_counter()
+                analysis = analyzer.execute(frame)
+                t2 = time.perf_counter()
+                ok, jpeg = cv2.imencode('.jpg', analysis["frame"])
+                t3 = time.perf_counter()
+                capture_seconds.observe(t1 - t0)
+                analyze_seconds.observe(t2 - t1)
+                encode_seconds.observe(t3 - t2)
+                if self.on_analysis is not None:
+                    self.on_analysis(analysis)
+                if not ok:
+                    continue
+                with self._cond:
+                    self._jpeg = jpeg.tobytes()
+                    self._seq += 1
+                    self.frames_published += 1
+                    self._notify()
+                published.inc()
+                self.fps.mark()
+        finally:
+            if camera is not None:
+                camera.release()
+            if self.on_stop is not None:
+                self.on_stop()
+            with self._cond:
+                # Si ya arrancó un hilo nuevo, el estado es suyo
+                if self._thread is threading.current_thread():
+                    self._running = False
+                    self.camera = None
+                self._notify()
+
+    def stats(self):
+        stats = {
+            "source": str(self.source),
+            "running": self._running,
+            "subscribers": self._subscribers,
+            "frames_published": self.frames_published,
+            "fps": round(self.fps.rate(), 1),
+        }
+        camera = self.camera
+        if camera is not None and hasattr(camera, "stats"):
+            stats["camera"] = camera.stats()
+        analyzer = self.analyzer
+        if analyzer is not None and hasattr(analyzer, "stats"):
+            stats["analysis"] = analyzer.stats()
+        return stats
+
+
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+
+
+def get_pipeline(source, **kwargs):
+    """Devuelve el pipeline compartido de `source`, creándolo la primera vez."""
+    with _pipelines_lock:
+        pipeline = _pipelines.get(source)
+        if pipeline is None:
+            pipeline = VideoPipeline(source, **kwargs)
+            _pipelines[source] = pipeline
+        return pipeline
+
+
+def all_pipelines():
+    with _pipelines_lock:
+        return list(_pipelines.values())
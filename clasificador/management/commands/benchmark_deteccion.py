@@ -0,0 +1,116 @@
+import time
+
+import cv2
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from clasificador.domain.leaf_detector import LeafDetector
+from clasificador.domain.leaf_tracker import iou
+
+
+def escena_sintetica(rng, size=(640, 480), hojas=3, ruido=40):
+    """Frame BGR con hojas verdes elípticas, manchas de otros colores y ruido."""
+    w, h = size
+    frame = np.full((h, w, 3), rng.integers(60, 140), np.uint8)
+    frame = cv2.add(frame, rng.integers(0, 30, (h, w, 3), dtype=np.uint8))
+    for _ in range(hojas):
+        center = (int(rng.integers(80, w - 80)), int(rng.integers(80, h - 80)))
+        axes = (int(rng.integers(45, 110)), int(rng.integers(35, 80)))
+        hue = int(rng.integers(45, 75))
+        color = cv2.cvtColor(np.uint8([[[hue, rng.integers(120, 230), rng.integers(110, 220)]]]), cv2.COLOR_HSV2BGR)[0, 0]
+        cv2.ellipse(frame, center, axes, float(rng.uniform(0, 180)), 0, 360, color.tolist(), -1)
+    # Motas verdes pequeñas y manchas que no son verdes: contornos que se deben descartar
+    for _ in range(ruido):
+        center = (int(rng.integers(0, w)), int(rng.integers(0, h)))
+        color = (40, 160, 40) if rng.random() < 0.5 else (30, 90, 160)
+        cv2.circle(frame, center, int(rng.integers(2, 12)), color, -1)
+    return cv2.GaussianBlur(frame, (3, 3), 0)
+
+
+class Command(BaseCommand):
+    help = (
+        "Tiempo por etapa de LeafDetector a distintas escalas de búsqueda y "
+        "coincidencia de detecciones contra la búsqueda a resolución completa"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escalas', type=float, nargs='+', default=[1.0, 0.5, 0.25])
+        parser.add_argument('--frames', type=int, default=200)
+        parser.add_argument('--video', help="Usar frames de un video en lugar de escenas sintéticas")
+        parser.add_argument('--ruido', type=int, nargs='+', default=[40],
+                            help="Manchas de ruido por escena sintética; con varios valores se mide "
+                                 "cómo crece el costo con el número de contornos")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        for ruido in ([None] if options['video'] else options['ruido']):
+            if ruido is not None:
+                self.stdout.write(f"\nruido={ruido}")
+            self._medir(self._cargar_frames(options, ruido), options['escalas'])
+
+    def _medir(self, frames, escalas):
+        referencia = LeafDetector()
+        esperadas = [[bbox for _, bbox in referencia.detect(f)] for f in frames]
+
+        etapas = ("resize", "segment", "contours", "filter")
+        self.stdout.write(
+            f"{'escala':>6} " + " ".join(f"{e:>9}" for e in etapas)
+            + f" {'total ms':>9} {'contornos':>10} {'coincidencia':>13}"
+        )
+        for escala in escalas:
+            detector = LeafDetector(downscale=escala)
+            tiempos = {e: [] for e in etapas}
+            coinciden = total = contornos = 0
+            for frame, ref in zip(frames, esperadas):
+                t0 = time.perf_counter()
+                small = detector.resize(frame)
+                t1 = time.perf_counter()
+                hsv, mask = detector.segment(small)
+                t2 = time.perf_counter()
+                contours = detector.find_contours(mask)
+                contornos += len(contours)
+                t3 = time.perf_counter()
+                candidates = detector.filter(contours, hsv, frame.shape)
+                t4 = time.perf_counter()
+                for etapa, inicio, fin in zip(etapas, (t0, t1, t2, t3), (t1, t2, t3, t4)):
+                    tiempos[etapa].append((fin - inicio) * 1000)
+
+                encontrados = [bbox for _, bbox in candidates]
+                coinciden += self._emparejar(ref, encontrados)
+                total += len(ref) + len(encontrados)
+
+            medianas = {e: float(np.median(t)) for e, t in tiempos.items()}
+            # F1 entre detecciones: 2·coincidencias / (referencia + encontradas)
+            acuerdo = 2 * coinciden / total if total else 1.0
+            self.stdout.write(
+                f"{escala:>6.2f} " + " ".join(f"{medianas[e]:>9.3f}" for e in etapas)
+                + f" {sum(medianas.values()):>9.3f} {contornos / len(frames):>10.0f} {acuerdo * 100:>12.1f}%"
+            )
+        self.stdout.write(f"{len(frames)} frames, {sum(len(r) for r in esperadas)} hojas en la referencia")
+
+    @staticmethod
+    def _emparejar(ref, encontrados, umbral=0.5):
+        """Número de detecciones que coinciden (IoU >= umbral) con la referencia."""
+        libres = list(encontrados)
+        coinciden = 0
+        for bbox in ref:
+            mejor = max(libres, key=lambda b: iou(bbox, b), default=None)
+            if mejor is not None and iou(bbox, mejor) >= umbral:
+                libres.remove(mejor)
+                coinciden += 1
+        return coinciden
+
+    @staticmethod
+    def _cargar_frames(options, ruido):
+        if options['video']:
+            cap = cv2.VideoCapture(options['video'])
+            frames = []
+            while len(frames) < options['frames']:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                frames.append(frame)
+            cap.release()
+            return frames
+        rng = np.random.default_rng(options['seed'])
+        return [escena_sintetica(rng, hojas=int(rng.integers(1, 5)), ruido=ruido) for _ in range(options['frames'])]
@@ -0,0 +1,52 @@
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from clasificador.infraestructure.inference_common import BatchBuffer
+
+
+class Command(BaseCommand):
+    help = "Compara la latencia de model.predict contra la ruta compilada de TensorflowPlantClassifier"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', default=settings.CLASIFICADOR_MODEL_PATH)
+        parser.add_argument('--labels', default=settings.CLASIFICADOR_LABELS_PATH)
+        parser.add_argument('--runs', type=int, default=100)
+        parser.add_argument('--batch', type=int, nargs='+', default=[1, 6])
+
+    def handle(self, *args, **options):
+        from clasificador.infraestructure.tf_classifier import TensorflowPlantClassifier
+
+        inicio = time.perf_counter()
+        classifier = TensorflowPlantClassifier(options['model'], options['labels'])
+        self.stdout.write(f"Carga + warm-up: {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+        rng = np.random.default_rng(0)
+        for batch_size in options['batch']:
+            crops = [rng.integers(0, 256, (160, 140, 3), dtype=np.uint8) for _ in range(batch_size)]
+            batch = BatchBuffer().fill(crops)
+
+            predict_ms = self._medir(lambda: classifier.model.predict(batch, verbose=0), options['runs'])
+            compiled_ms = self._medir(lambda: classifier._infer(batch).numpy(), options['runs'])
+
+            # Ambas rutas deben dar la misma salida
+            diff = np.max(np.abs(classifier.model.predict(batch, verbose=0) - classifier._infer(batch).numpy()))
+
+            self.stdout.write(
+                f"lote={batch_size:<3} predict: {predict_ms:7.2f} ms   "
+                f"compilado: {compiled_ms:7.2f} ms   "
+                f"x{predict_ms / compiled_ms:.1f}   (máx. dif. {diff:.2e})"
+            )
+
+    @staticmethod
+    def _medir(fn, runs):
+        """Mediana en ms de `runs` llamadas, tras una de calentamiento."""
+        fn()
+        tiempos = []
+        for _ in range(runs):
+            inicio = time.perf_counter()
+            fn()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        return float(np.median(tiempos))
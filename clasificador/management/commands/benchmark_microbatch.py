@@ -0,0 +1,64 @@
+import threading
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from clasificador.application.classify_plant_usecase import ClassifyPlantUseCase
+from clasificador.application.micro_batching import MicroBatchScheduler
+from clasificador.infraestructure.classifier_factory import build_classifier
+
+
+class Command(BaseCommand):
+    help = "Peticiones/s y latencia p99 con N clientes concurrentes: llamada directa vs micro-lotes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 32])
+        parser.add_argument('--requests', type=int, default=50, help="Peticiones por cliente")
+        parser.add_argument('--max-batch', type=int, default=32)
+        parser.add_argument('--max-wait-ms', type=float, default=3.0)
+
+    def handle(self, *args, **options):
+        usecase = ClassifyPlantUseCase(build_classifier())
+        scheduler = MicroBatchScheduler(usecase, options['max_batch'], options['max_wait_ms'] / 1000)
+
+        rng = np.random.default_rng(0)
+        crops = [rng.integers(0, 256, (160, 140, 3), dtype=np.uint8) for _ in range(64)]
+
+        self.stdout.write(f"{'clientes':>8} {'modo':>12} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+        for concurrency in options['concurrency']:
+            for nombre, target in (("directo", usecase), ("micro-lotes", scheduler)):
+                rps, p50, p99 = self._run(target, crops, concurrency, options['requests'])
+                self.stdout.write(f"{concurrency:>8} {nombre:>12} {rps:>9.1f} {p50:>8.2f} {p99:>8.2f}")
+        scheduler.close()
+
+    @staticmethod
+    def _run(target, crops, concurrency, requests):
+        latencies = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(concurrency + 1)
+
+        def client(offset):
+            local = []
+            barrier.wait()
+            for i in range(requests):
+                inicio = time.perf_counter()
+                target.execute(crops[(offset + i) % len(crops)])
+                local.append((time.perf_counter() - inicio) * 1000)
+            with lock:
+                latencies.extend(local)
+
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        total = time.perf_counter() - inicio
+
+        return (
+            len(latencies) / total,
+            float(np.percentile(latencies, 50)),
+            float(np.percentile(latencies, 99)),
+        )
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import pickle
+import platform
+import tempfile
+import time
+
+import cv2
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from clasificador.domain.color_analizer import ColorAnalyzer
+from clasificador.domain.leaf_detector import LeafDetector
+from clasificador.infraestructure.inference_common import INPUT_SIZE
+from clasificador.management.commands.benchmark_deteccion import escena_sintetica
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, 'benchmarks', 'baseline.json')
+# Mismo número de clases que labels_v5.pkl
+N_CLASES = 15
+# Claves de "entorno" que deben coincidir con las del baseline para comparar tiempos
+ENTORNO_COMPARABLE = ("python", "cpus", "numpy", "opencv", "tensorflow", "escala_deteccion")
+
+
+def fixtures(seed, n_frames):
+    """Frames sintéticos deterministas y un recorte de hoja de cada uno."""
+    rng = np.random.default_rng(seed)
+    frames = [escena_sintetica(rng, hojas=int(rng.integers(1, 5))) for _ in range(n_frames)]
+    crops = []
+    detector = LeafDetector()
+    for frame in frames:
+        candidates = detector.detect(frame)
+        if candidates:
+            x, y, w, h = candidates[0][1]
+            crops.append(frame[y:y + h, x:x + w])
+        else:
+            crops.append(frame[160:320, 240:400])
+    digest = hashlib.sha1(b"".join(f.tobytes() for f in frames)).hexdigest()
+    return frames, crops, digest
+
+
+def modelo_dummy(directory, seed):
+    """
+    CNN pequeña con la misma entrada que la real (128x128x3) y pesos fijos por
+    semilla, guardada como .h5 junto a un pickle de etiquetas. Mide el camino de
+    TensorflowPlantClassifier sin depender del modelo entrenado.
+    """
+    import tensorflow as tf
+
+    tf.keras.utils.set_random_seed(seed)
+    model = tf.keras.Sequential([
+        tf.keras.Input((INPUT_SIZE[1], INPUT_SIZE[0], 3)),
+        tf.keras.layers.Conv2D(16, 3, strides=2, activation="relu"),
+        tf.keras.layers.Conv2D(32, 3, strides=2, activation="relu"),
+        tf.keras.layers.Conv2D(64, 3, strides=2, activation="relu"),
+        tf.keras.layers.GlobalAveragePooling2D(),
+        tf.keras.layers.Dense(N_CLASES, activation="softmax"),
+    ])
+    model_path = os.path.join(directory, "modelo_dummy.h5")
+    labels_path = os.path.join(directory, "labels_dummy.pkl")
+    model.save(model_path)
+    with open(labels_path, "wb") as f:
+        pickle.dump({f"clase_{i}": i for i in range(N_CLASES)}, f)
+    return model_path, labels_path
+
+
+class Command(BaseCommand):
+    help = (
+        "Suite de benchmarks reproducible (escenas sintéticas y modelo dummy): color, "
+        "detección de contornos, clasificación y JPEG. Escribe JSON y compara contra un baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--salida', help="Archivo JSON con los resultados")
+        parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+        parser.add_argument('--guardar-baseline', action='store_true',
+                            help="Escribir los resultados como nuevo baseline")
+        parser.add_argument('--tolerancia', type=float, default=0.15,
+                            help="Fracción de aumento de estable_ms que cuenta como regresión")
+        parser.add_argument('--fallar', action='store_true',
+                            help="Terminar con error si hay alguna regresión")
+        parser.add_argument('--frames', type=int, default=50)
+        parser.add_argument('--repeticiones', type=int, default=5, help="Pasadas sobre todos los frames")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        frames, crops, digest = fixtures(options['seed'], options['frames'])
+        repeticiones = options['repeticiones']
+        detector = LeafDetector(downscale=settings.CLASIFICADOR_DETECCION_ESCALA)
+
+        casos = {
+            "color": self._medir(ColorAnalyzer.detectar_colores_frame, crops, repeticiones),
+            "contornos": self._medir(detector.detect, frames, repeticiones),
+            "jpeg": self._medir(lambda f: cv2.imencode('.jpg', f), frames, repeticiones),
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            from clasificador.infraestructure.tf_classifier import TensorflowPlantClassifier
+            classifier = TensorflowPlantClassifier(*modelo_dummy(directory, options['seed']))
+            casos["clasificacion"] = self._medir(classifier.classify, crops, repeticiones)
+
+        resultados = {
+            "fixtures": {"seed": options['seed'], "frames": len(frames), "sha1": digest},
+            "entorno": self._entorno(),
+            "casos": casos,
+        }
+
+        baseline = self._cargar_baseline(options['baseline'])
+        regresiones = []
+        if baseline is not None:
+            if baseline.get("fixtures") != resultados["fixtures"]:
+                self.stdout.write(self.style.WARNING(
+                    "Los fixtures no coinciden con los del baseline: la comparación no es válida"
+                ))
+            distintos = [
+                f"{clave} {baseline.get('entorno', {}).get(clave)} → {valor}"
+                for clave, valor in resultados["entorno"].items()
+                if clave in ENTORNO_COMPARABLE and baseline.get("entorno", {}).get(clave) != valor
+            ]
+            if distintos:
+                # Con otras versiones se mide el cambio de biblioteca, no el del código
+                self.stdout.write(self.style.WARNING(
+                    "El entorno no coincide con el del baseline (" + ", ".join(distintos) + "); "
+                    "regenérelo con --guardar-baseline en este entorno"
+                ))
+            resultados["comparacion"] = self._comparar(casos, baseline["casos"], options['tolerancia'])
+            regresiones = [c for c, r in resultados["comparacion"].items() if r["regresion"]]
+
+        self._imprimir(resultados)
+
+        if options['salida']:
+            self._escribir(options['salida'], resultados)
+        if options['guardar_baseline']:
+            self._escribir(options['baseline'], {k: v for k, v in resultados.items() if k != "comparacion"})
+            self.stdout.write(f"Baseline guardado en {options['baseline']}")
+        if regresiones and options['fallar']:
+            raise CommandError(f"Regresión en: {', '.join(regresiones)}")
+
+    @staticmethod
+    def _medir(fn, entradas, repeticiones):
+        """
+        Ms por llamada tras una pasada de calentamiento. `estable_ms` (la menor
+        de las medianas de cada pasada) es la que se compara con el baseline:
+        una pasada perturbada por otro proceso no la mueve.
+        """
+        for entrada in entradas[:5]:
+            fn(entrada)
+        tiempos = []
+        medianas = []
+        for _ in range(repeticiones):
+            pasada = []
+            for entrada in entradas:
+                inicio = time.perf_counter()
+                fn(entrada)
+                pasada.append((time.perf_counter() - inicio) * 1000)
+            medianas.append(float(np.median(pasada)))
+            tiempos.extend(pasada)
+        return {
+            "estable_ms": round(min(medianas), 4),
+            "mediana_ms": round(float(np.median(tiempos)), 4),
+            "p90_ms": round(float(np.percentile(tiempos, 90)), 4),
+            "media_ms": round(float(np.mean(tiempos)), 4),
+            "llamadas": len(tiempos),
+        }
+
+    @staticmethod
+    def _comparar(casos, baseline, tolerancia):
+        comparacion = {}
+        for caso, actual in casos.items():
+            anterior = baseline.get(caso)
+            if anterior is None:
+                continue
+            ratio = actual["estable_ms"] / anterior["estable_ms"] if anterior["estable_ms"] else 1.0
+            comparacion[caso] = {
+                "baseline_ms": anterior["estable_ms"],
+                "ratio": round(ratio, 3),
+                "regresion": ratio > 1 + tolerancia,
+            }
+        return comparacion
+
+    @staticmethod
+    def _entorno():
+        import tensorflow as tf
+        return {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "opencv_hilos": cv2.getNumThreads(),
+            "tensorflow": tf.__version__,
+            "escala_deteccion": settings.CLASIFICADOR_DETECCION_ESCALA,
+        }
+
+    @staticmethod
+    def _cargar_baseline(path):
+        if not path or not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _escribir(path, data):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+
+    def _imprimir(self, resultados):
+        comparacion = resultados.get("comparacion", {})
+        self.stdout.write(
+            f"{'caso':>14} {'estable ms':>11} {'mediana ms':>11} {'p90 ms':>9} {'baseline':>9} {'ratio':>7}"
+        )
+        for caso, r in resultados["casos"].items():
+            linea = f"{caso:>14} {r['estable_ms']:>11.3f} {r['mediana_ms']:>11.3f} {r['p90_ms']:>9.3f}"
+            c = comparacion.get(caso)
+            if c is not None:
+                linea += f" {c['baseline_ms']:>9.3f} {c['ratio']:>7.2f}"
+                if c["regresion"]:
+                    self.stdout.write(self.style.ERROR(linea + "  REGRESIÓN"))
+                    continue
+            self.stdout.write(linea)
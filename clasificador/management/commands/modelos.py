@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from clasificador.infraestructure.classifier_factory import get_registry
+
+
+class Command(BaseCommand):
+    help = "Administra el registro de modelos: listar, agregar, activar y volver a la versión anterior"
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest='accion', required=True)
+
+        subparsers.add_parser('listar', help="Lista las versiones y marca la activa")
+
+        agregar = subparsers.add_parser('agregar', help="Copia un modelo al registro como nueva versión")
+        agregar.add_argument('version')
+        agregar.add_argument('modelo')
+        agregar.add_argument('etiquetas')
+        agregar.add_argument('--activar', action='store_true')
+
+        activar = subparsers.add_parser('activar', help="Activa una versión (los workers la cargan en caliente)")
+        activar.add_argument('version')
+
+        subparsers.add_parser('rollback', help="Vuelve a la versión activa anterior")
+
+    def handle(self, *args, **options):
+        registry = get_registry()
+        accion = options['accion']
+
+        try:
+            if accion == 'listar':
+                activa = registry.active_version()
+                versiones = registry.versions()
+                if not versiones:
+                    self.stdout.write(f"No hay versiones en {registry.root}")
+                for version in versiones:
+                    marca = "*" if version == activa else " "
+                    self.stdout.write(f"{marca} {version}")
+
+            elif accion == 'agregar':
+                registry.add(options['version'], options['modelo'], options['etiquetas'])
+                self.stdout.write(self.style.SUCCESS(f"✅ Versión {options['version']} agregada"))
+                if options['activar']:
+                    registry.activate(options['version'])
+                    self.stdout.write(self.style.SUCCESS(f"✅ Versión {options['version']} activada"))
+
+            elif accion == 'activar':
+                registry.activate(options['version'])
+                self.stdout.write(self.style.SUCCESS(f"✅ Versión {options['version']} activada"))
+
+            elif accion == 'rollback':
+                version = registry.rollback()
+                self.stdout.write(self.style.SUCCESS(f"✅ Versión {version} activada de nuevo"))
+
+        except (ValueError, FileNotFoundError) as e:
+            raise CommandError(str(e))
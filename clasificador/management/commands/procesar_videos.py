@@ -0,0 +1,142 @@
+import csv
+import json
+import multiprocessing
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from clasificador.infraestructure.frame_sources import list_tasks, read_task
+
+CSV_FIELDS = ["fuente", "frame", "tiempo_ms", "label", "prob",
+              "verde", "amarillo", "marron", "rojo", "estado", "descripcion", "detecciones"]
+
+# Estado de cada proceso del pool: un modelo por trabajador
+_worker = {}
+
+
+def _init_worker(backend, escala, step):
+    # Un hilo por proceso: el paralelismo lo da el pool, no TensorFlow, TFLite ni OpenCV
+    os.environ["TF_NUM_INTRAOP_THREADS"] = "1"
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "Leaftech.settings")
+    import django
+    django.setup()
+
+    import cv2
+    cv2.setNumThreads(1)
+
+    from clasificador.application.classify_plant_usecase import ClassifyPlantUseCase
+    from clasificador.application.offline_analysis_usecase import OfflineAnalysisUseCase
+    from clasificador.domain.color_analizer import ColorAnalyzer
+    from clasificador.domain.leaf_detector import LeafDetector
+    from clasificador.infraestructure.classifier_factory import build_classifier
+
+    try:
+        classifier = build_classifier(backend, tflite_threads=1)
+    except Exception as e:
+        # Si el inicializador falla, Pool reemplaza al proceso una y otra vez:
+        # el error se entrega con la primera tarea y corta el comando
+        _worker["error"] = f"{type(e).__name__}: {e}"
+        return
+    _worker["usecase"] = OfflineAnalysisUseCase(
+        ClassifyPlantUseCase(classifier),
+        ColorAnalyzer(),
+        LeafDetector(downscale=escala),
+    )
+    _worker["step"] = step
+
+
+def _process(task):
+    if "error" in _worker:
+        raise RuntimeError(f"No se pudo cargar el clasificador: {_worker['error']}")
+    frames = list(read_task(task, _worker["step"]))
+    return _worker["usecase"].execute(frames)
+
+
+class Command(BaseCommand):
+    help = (
+        "Analiza videos o directorios de imágenes grabados con un pool de procesos "
+        "(un modelo por proceso) y escribe un registro por frame, en orden, en JSONL o CSV"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('entradas', nargs='+', help="Archivos de video o directorios de imágenes")
+        parser.add_argument('--salida', required=True, help="Archivo .jsonl o .csv")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--backend', default=settings.CLASIFICADOR_BACKEND, choices=['keras', 'tflite', 'remote'])
+        parser.add_argument('--escala', type=float, default=settings.CLASIFICADOR_DETECCION_ESCALA,
+                            help="Escala de búsqueda de hojas (ver benchmark_deteccion)")
+        parser.add_argument('--paso', type=int, default=1, help="Analizar uno de cada N frames")
+        parser.add_argument('--lote', type=int, default=64, help="Frames por tarea del pool")
+
+    def handle(self, *args, **options):
+        salida = options['salida']
+        formato = os.path.splitext(salida)[1].lower()
+        if formato not in (".jsonl", ".csv"):
+            raise CommandError("--salida debe terminar en .jsonl o .csv")
+        for entrada in options['entradas']:
+            if not os.path.exists(entrada):
+                raise CommandError(f"No existe: {entrada}")
+
+        try:
+            tasks = list_tasks(options['entradas'], options['lote'], options['paso'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        workers = max(1, min(options['workers'], len(tasks)))
+        self.stdout.write(f"{len(tasks)} tareas en {workers} procesos")
+
+        inicio = time.perf_counter()
+        frames = 0
+        # spawn: cada trabajador carga su propio TensorFlow desde cero
+        ctx = multiprocessing.get_context("spawn")
+        with open(salida, "w", newline="", encoding="utf-8") as out, ctx.Pool(
+            workers, initializer=_init_worker, initargs=(options['backend'], options['escala'], options['paso'])
+        ) as pool:
+            write = self._writer(out, formato)
+            # imap conserva el orden de las tareas: la salida queda en orden aunque
+            # los trabajadores terminen en cualquier orden
+            try:
+                for records in pool.imap(_process, tasks):
+                    for record in records:
+                        write(record)
+                    frames += len(records)
+                    out.flush()
+            except RuntimeError as e:
+                raise CommandError(str(e))
+
+        elapsed = time.perf_counter() - inicio
+        fps = frames / elapsed if elapsed else 0.0
+        self.stdout.write(
+            f"{frames} frames en {elapsed:.1f} s: {fps:.1f} frames/s, "
+            f"{fps / workers:.1f} frames/s por núcleo ({workers} procesos)"
+        )
+
+    @staticmethod
+    def _writer(out, formato):
+        if formato == ".jsonl":
+            def write(record):
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            return write
+
+        writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+
+        def write(record):
+            color = record["color"] or {}
+            writer.writerow({
+                "fuente": record["fuente"],
+                "frame": record["frame"],
+                "tiempo_ms": record["tiempo_ms"],
+                "label": record["label"],
+                "prob": record["prob"],
+                "verde": color.get("verde"),
+                "amarillo": color.get("amarillo"),
+                "marron": color.get("marron"),
+                "rojo": color.get("rojo"),
+                "estado": color.get("estado"),
+                "descripcion": color.get("descripcion"),
+                "detecciones": json.dumps(record["detecciones"], ensure_ascii=False),
+            })
+        return write
@@ -0,0 +1,74 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Abre N espectadores concurrentes contra el stream MJPEG y mide cuántos "
+        "reciben video a la vez (sirve para comparar un worker WSGI contra uno ASGI)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000/video_feed/')
+        parser.add_argument('--viewers', type=int, nargs='+', default=[1, 4, 16, 64])
+        parser.add_argument('--duration', type=float, default=5.0,
+                            help="Segundos que cada espectador mantiene el stream abierto")
+        parser.add_argument('--min-fps', type=float, default=1.0,
+                            help="FPS mínimos para contar a un espectador como servido")
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        self.stdout.write(f"{'espectadores':>12} {'servidos':>9} {'fps medio':>10} {'1er frame (ms)':>15}")
+        for viewers in options['viewers']:
+            fps, first = asyncio.run(self._carga(url, viewers, options['duration']))
+            served = sum(1 for f in fps if f >= options['min_fps'])
+            mean_fps = sum(fps) / len(fps)
+            first_ms = [f * 1000 for f in first if f is not None]
+            first_txt = f"{max(first_ms):.0f}" if first_ms else "-"
+            self.stdout.write(f"{viewers:>12} {served:>9} {mean_fps:>10.1f} {first_txt:>15}")
+
+    async def _carga(self, url, viewers, duration):
+        results = await asyncio.gather(*(self._espectador(url, duration) for _ in range(viewers)))
+        return [r[0] for r in results], [r[1] for r in results]
+
+    @staticmethod
+    async def _espectador(url, duration):
+        """Devuelve (fps recibidos, segundos hasta el primer frame o None)."""
+        inicio = time.perf_counter()
+        frames = 0
+        first = None
+        writer = None
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(url.hostname, url.port or 80), duration
+            )
+            path = url.path + (f"?{url.query}" if url.query else "")
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {url.netloc}\r\nConnection: close\r\n\r\n".encode())
+            await writer.drain()
+
+            fin = inicio + duration
+            pending = b""
+            while True:
+                restante = fin - time.perf_counter()
+                if restante <= 0:
+                    break
+                chunk = await asyncio.wait_for(reader.read(65536), restante)
+                if not chunk:
+                    break
+                # Contar los separadores de frame, aunque queden partidos entre lecturas
+                pending += chunk
+                count = pending.count(b"--frame")
+                if count:
+                    frames += count
+                    if first is None:
+                        first = time.perf_counter() - inicio
+                pending = pending[-6:]
+        except (asyncio.TimeoutError, OSError):
+            pass
+        finally:
+            if writer is not None:
+                writer.close()
+        return frames / duration, first
@@ -0,0 +1,36 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from clasificador.infraestructure.classifier_factory import build_classifier
+from clasificador.infraestructure.inference_service import InferenceServer
+
+
+class Command(BaseCommand):
+    help = "Inicia el servicio de inferencia compartido por los workers web (CLASIFICADOR_BACKEND='remote')"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--address', default=settings.CLASIFICADOR_SERVICE_ADDRESS)
+        parser.add_argument('--backend', default=settings.CLASIFICADOR_SERVICE_BACKEND,
+                            choices=['keras', 'tflite'])
+        parser.add_argument('--max-batch', type=int, default=settings.CLASIFICADOR_SERVICE_MAX_BATCH)
+
+    def handle(self, *args, **options):
+        address = options['address']
+        if os.path.exists(address):
+            # Socket huérfano de una ejecución anterior
+            os.unlink(address)
+
+        classifier = build_classifier(options['backend'])
+        server = InferenceServer(
+            classifier,
+            address,
+            settings.CLASIFICADOR_SERVICE_AUTHKEY.encode(),
+            max_batch=options['max_batch'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"✅ Servicio de inferencia ({options['backend']}) escuchando en {address}"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.close()
@@ -0,0 +1,115 @@
+// ============================================
+// CÁMARA DEL NAVEGADOR
+// ============================================
+// Cuando el servidor no tiene cámara, el navegador captura cada frame, lo
+// reduce y lo envía a /analyze_frame/. Solo hay un envío en curso a la vez:
+// el siguiente frame se captura al llegar la respuesta del anterior, así un
+// cliente lento nunca acumula frames atrasados. Los resultados llegan por
+// el stream SSE de esta pestaña (page.js). Si el servidor rechaza los envíos
+// de forma permanente la cámara se apaga y se emite 'camara-navegador-detenida'.
+
+const ANCHO_ENVIO = 320;
+const CALIDAD_JPEG = 0.7;
+// Backoff tras un envío fallido: 0.5 s, 1 s, 2 s... hasta 10 s
+const ESPERA_INICIAL_MS = 500;
+const ESPERA_MAXIMA_MS = 10000;
+// Respuestas que reintentar no arregla (sesión/CSRF, método, URL)
+const ERRORES_PERMANENTES = [401, 403, 404, 405];
+
+// Identificador del stream de esta pestaña
+window.STREAM_ID = window.STREAM_ID || Math.random().toString(36).slice(2, 10);
+
+window.camaraNavegador = (function () {
+    const video = document.getElementById('videoStream');
+    const canvas = document.createElement('canvas');
+    const ctx = canvas.getContext('2d');
+    let mediaStream = null;
+    let activa = false;
+
+    /**
+     * Pide acceso a la cámara y empieza a enviar frames
+     */
+    async function start() {
+        mediaStream = await navigator.mediaDevices.getUserMedia({
+            video: { width: 640, height: 480 },
+            audio: false
+        });
+        video.srcObject = mediaStream;
+        await video.play();
+        activa = true;
+        enviarFrames();
+    }
+
+    /**
+     * Detiene el envío y libera la cámara
+     */
+    function stop() {
+        activa = false;
+        if (mediaStream) {
+            mediaStream.getTracks().forEach(track => track.stop());
+            mediaStream = null;
+        }
+        video.srcObject = null;
+    }
+
+    /**
+     * Captura el frame actual reducido a ANCHO_ENVIO píxeles de ancho
+     * @returns {Promise<Blob>} Frame en JPEG
+     */
+    function capturar() {
+        const escala = Math.min(1, ANCHO_ENVIO / video.videoWidth);
+        canvas.width = Math.round(video.videoWidth * escala);
+        canvas.height = Math.round(video.videoHeight * escala);
+        ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
+        return new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', CALIDAD_JPEG));
+    }
+
+    /**
+     * Envía los frames uno a uno mientras la cámara esté activa. Ante un
+     * error de red o una respuesta no 2xx espera con backoff exponencial;
+     * si el servidor rechaza el envío de forma permanente (403, 405...) se
+     * detiene en vez de reintentar.
+     */
+    async function enviarFrames() {
+        let espera = ESPERA_INICIAL_MS;
+        while (activa) {
+            const ts = Date.now();
+            const frame = await capturar();
+            let fallo = null;
+            try {
+                const response = await fetch(`${window.ANALYZE_FRAME_URL}?stream=${window.STREAM_ID}&ts=${ts}`, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'image/jpeg',
+                        'X-CSRFToken': getCSRFToken()
+                    },
+                    body: frame
+                });
+                if (ERRORES_PERMANENTES.includes(response.status)) {
+                    console.error(`El servidor rechazó el frame (HTTP ${response.status}); se detiene el envío`);
+                    stop();
+                    // page.js actualiza el botón y avisa al usuario
+                    window.dispatchEvent(new CustomEvent('camara-navegador-detenida', {
+                        detail: { status: response.status }
+                    }));
+                    return;
+                }
+                if (!response.ok) {
+                    fallo = `HTTP ${response.status}`;
+                }
+            } catch (error) {
+                fallo = error;
+            }
+
+            if (fallo === null) {
+                espera = ESPERA_INICIAL_MS;
+                continue;
+            }
+            console.error('Error al enviar el frame:', fallo);
+            await new Promise(resolve => setTimeout(resolve, espera));
+            espera = Math.min(espera * 2, ESPERA_MAXIMA_MS);
+        }
+    }
+
+    return { start, stop };
+})();
@@ -5,6 +5,7 @@ let currentPlantData = null;
 let misEjemplares = [];
 let ejemplarSeleccionado = null;
 let cameraOn = true;
+let ultimaEtiqueta = null;
 
 // ============================================
 // ELEMENTOS DEL DOM
@@ -42,6 +43,15 @@ function getCSRFToken() {
     return document.querySelector('[name=csrfmiddlewaretoken]').value;
 }
 
+/**
+ * Agrega el stream de esta pestaña a la URL (cámara del navegador)
+ * @param {string} url - URL base
+ * @returns {string} URL con ?stream= si la pestaña tiene stream propio
+ */
+function urlConStream(url) {
+    return window.STREAM_ID ? `${url}?stream=${encodeURIComponent(window.STREAM_ID)}` : url;
+}
+
 /**
  * Verifica si la planta detectada es válida
  * @param {object} data - Datos de la planta
@@ -62,7 +72,7 @@ function esPlantaValida(data) {
  * Actualiza toda la información de la planta en la interfaz
  */
 function updatePlantInfo() {
-    fetch(window.GET_PLANT_DATA_URL)
+    fetch(urlConStream(window.GET_PLANT_DATA_URL))
         .then(response => response.json())
         .then(data => {
             currentPlantData = data;
@@ -79,6 +89,39 @@ function updatePlantInfo() {
         .catch(error => console.error('Error al obtener los datos de la planta:', error));
 }
 
+/**
+ * Aplica un evento SSE del servidor: etiqueta, probabilidad y color llegan
+ * en el propio evento; el catálogo solo se consulta cuando cambia la especie
+ * @param {MessageEvent} event - Evento 'planta' del stream
+ */
+function aplicarEventoPlanta(event) {
+    const data = JSON.parse(event.data);
+    currentPlantData = { ...currentPlantData, ...data };
+    actualizarNombrePlanta(currentPlantData);
+    actualizarAnalisisColor(currentPlantData);
+
+    if (data.label !== ultimaEtiqueta) {
+        ultimaEtiqueta = data.label;
+        updatePlantInfo();
+    }
+}
+
+/**
+ * Se suscribe al stream de eventos del servidor (o vuelve al sondeo
+ * si el navegador no soporta EventSource o el servidor corre bajo WSGI)
+ */
+function iniciarEventosPlanta() {
+    if (!window.EventSource || !window.PLANT_EVENTS_URL) {
+        updatePlantInfo();
+        setInterval(updatePlantInfo, 2000);
+        return;
+    }
+
+    // EventSource se reconecta solo si el servidor corta la conexión
+    const eventos = new EventSource(urlConStream(window.PLANT_EVENTS_URL));
+    eventos.addEventListener('planta', aplicarEventoPlanta);
+}
+
 /**
  * Actualiza el nombre de la planta y botones relacionados
  */
@@ -357,6 +400,10 @@ async function guardarPlanta(e) {
  * Enciende o apaga la cámara
  */
 function toggleCamera() {
+    if (window.camaraNavegador) {
+        toggleCamaraNavegador();
+        return;
+    }
     if (cameraOn) {
         video.src = video.dataset.placeholder;
         toggleBtn.textContent = "Encender cámara";
@@ -370,6 +417,26 @@ function toggleCamera() {
     }
 }
 
+/**
+ * Enciende o apaga la cámara del navegador
+ */
+function toggleCamaraNavegador() {
+    if (cameraOn) {
+        window.camaraNavegador.stop();
+        toggleBtn.textContent = "Encender cámara";
+        toggleBtn.classList.add('off');
+        cameraOn = false;
+    } else {
+        window.camaraNavegador.start()
+            .then(() => {
+                toggleBtn.textContent = "Apagar cámara";
+                toggleBtn.classList.remove('off');
+                cameraOn = true;
+            })
+            .catch(error => showNotification('No se pudo abrir la cámara: ' + error, 'error'));
+    }
+}
+
 // ============================================
 // EVENT LISTENERS
 // ============================================
@@ -401,6 +468,22 @@ function initEventListeners() {
 
     // Control de cámara
     toggleBtn.addEventListener('click', toggleCamera);
+
+    // La cámara del navegador se apagó sola (el servidor rechaza los frames)
+    window.addEventListener('camara-navegador-detenida', function(event) {
+        toggleBtn.textContent = "Encender cámara";
+        toggleBtn.classList.add('off');
+        cameraOn = false;
+        showNotification(`El servidor rechazó los frames (HTTP ${event.detail.status})`, 'error');
+    });
+
+    // Selector de cámara (solo si el servidor tiene varias)
+    const selectorCamara = document.getElementById('selectorCamara');
+    if (selectorCamara) {
+        selectorCamara.addEventListener('change', function() {
+            window.location.search = `?stream=${encodeURIComponent(this.value)}`;
+        });
+    }
 }
 
 // ============================================
@@ -412,10 +495,15 @@ function initEventListeners() {
  */
 function init() {
     initEventListeners();
-    updatePlantInfo();
 
-    // Actualiza cada 2 segundos
-    setInterval(updatePlantInfo, 2000);
+    // El servidor empuja los cambios; el primer evento carga toda la información
+    iniciarEventosPlanta();
+
+    // Sin cámara en el servidor, el navegador envía sus propios frames
+    if (window.camaraNavegador) {
+        window.camaraNavegador.start()
+            .catch(error => showNotification('No se pudo abrir la cámara: ' + error, 'error'));
+    }
 }
 
 // Ejecutar cuando el DOM esté listo
@@ -1,3 +1,1176 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 
-# Create your tests here.
+from unittest import mock
+
+import cv2
+import numpy as np
+from django.core.cache.backends.filebased import FileBasedCache
+from django.test import SimpleTestCase, override_settings
+
+from clasificador.application.analyze_frame_usecase import AnalyzeFrameUseCase
+from clasificador.application.frame_upload_usecase import LatestFrameAnalysisUseCase
+from clasificador.application.micro_batching import MicroBatchScheduler
+from clasificador.application.inference_scheduler import FairInferenceScheduler
+from clasificador.domain.color_analizer import ColorAnalyzer
+from clasificador.domain.leaf_detector import LeafDetector
+from clasificador.domain.leaf_tracker import LeafTracker
+from clasificador.domain.motion_gate import MotionGate
+from clasificador.domain.plant_classifier import PlantClassifierPort
+from clasificador.infraestructure import classifier_factory
+from clasificador.infraestructure.cached_classifier import CachedPlantClassifier
+from clasificador.infraestructure.camera import LatestFrameCamera
+from clasificador.infraestructure.camera_sources import LoopingFileCapture, parse_sources
+from clasificador.infraestructure.inference_common import INPUT_SIZE, BatchBuffer
+from clasificador.infraestructure.inference_service import RemotePlantClassifier
+from clasificador.infraestructure.model_registry import HotSwapPlantClassifier, ModelRegistry
+from clasificador.infraestructure.result_events import ResultBroadcaster
+from clasificador.infraestructure.result_store import DEFAULT_COLOR, DetectionResultStore, StreamLease
+from clasificador.infraestructure.video_pipeline import VideoPipeline
+from clasificador.management.commands.benchmark_deteccion import escena_sintetica
+from clasificador.management.commands.benchmark_suite import modelo_dummy
+
+
+class ContadorClassifier(PlantClassifierPort):
+    """Clasificador falso que cuenta los recortes que llegan al modelo."""
+
+    def __init__(self):
+        self.llamadas = 0
+        self.lotes = []
+
+    def classify(self, image):
+        return self.classify_batch([image])[0]
+
+    def classify_batch(self, images):
+        self.llamadas += len(images)
+        self.lotes.append(len(images))
+        return [("especie", 0.9) for _ in images]
+
+
+class BrilloClassifier(ContadorClassifier):
+    """
+    Etiqueta cada imagen con su brillo medio (qué píxeles llegaron) y usa el
+    tamaño del lote como probabilidad (cuántos recortes compartieron la pasada).
+    """
+
+    def classify_batch(self, images):
+        super().classify_batch(images)
+        return [(str(int(round(float(image.mean())))), float(len(images))) for image in images]
+
+
+class ColgadoClassifier(BrilloClassifier):
+    """Servicio que recibe la petición y no responde (modelo colgado)."""
+
+    def classify_batch(self, images):
+        time.sleep(60)
+        return super().classify_batch(images)
+
+
+def escena_estatica(seed, frames, sigma):
+    """Una misma escena repetida con ruido gaussiano del sensor en cada frame."""
+    base = escena_sintetica(np.random.default_rng(seed), hojas=2).astype(np.float32)
+    rng = np.random.default_rng(seed + 1)
+    for _ in range(frames):
+        yield np.clip(base + rng.normal(0, sigma, base.shape), 0, 255).astype(np.uint8)
+
+
+def recortes(frame, detector):
+    return [frame[y:y + h, x:x + w] for _, (x, y, w, h) in detector.detect(frame)]
+
+
+class CachedPlantClassifierTests(SimpleTestCase):
+    def test_escena_estatica_con_ruido_evita_casi_todas_las_inferencias(self):
+        detector = LeafDetector()
+        for sigma in (0, 1, 2, 4):
+            with self.subTest(sigma=sigma):
+                modelo = ContadorClassifier()
+                cache = CachedPlantClassifier(modelo, ttl=60.0)
+                total = 0
+                for frame in escena_estatica(0, 100, sigma):
+                    crops = recortes(frame, detector)
+                    cache.classify_batch(crops)
+                    total += len(crops)
+                self.assertGreaterEqual(total, 100)
+                self.assertGreaterEqual(cache.stats()["hit_rate"], 0.95)
+                self.assertLessEqual(modelo.llamadas, total * 0.05)
+
+    def test_escena_distinta_no_reutiliza_la_prediccion(self):
+        detector = LeafDetector()
+        modelo = ContadorClassifier()
+        cache = CachedPlantClassifier(modelo, ttl=60.0)
+        a = recortes(next(escena_estatica(0, 1, 0)), detector)
+        b = recortes(next(escena_estatica(7, 1, 0)), detector)
+        cache.classify_batch(a)
+        cache.classify_batch(b)
+        self.assertEqual(modelo.llamadas, len(a) + len(b))
+
+    def test_entrada_vencida_vuelve_al_modelo(self):
+        modelo = ContadorClassifier()
+        cache = CachedPlantClassifier(modelo, ttl=0.0)
+        crop = recortes(next(escena_estatica(0, 1, 0)), LeafDetector())[0]
+        cache.classify(crop)
+        cache.classify(crop)
+        self.assertEqual(modelo.llamadas, 2)
+
+
+def segmentos_shm():
+    return set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+
+SERVIDOR_DE_PRUEBA = """
+import sys
+from clasificador.infraestructure.inference_service import InferenceServer
+from clasificador import tests
+classifier = getattr(tests, sys.argv[2])()
+InferenceServer(classifier, sys.argv[1], b"pruebas", max_wait=0.05).serve_forever()
+"""
+
+
+class InferenceServiceTests(SimpleTestCase):
+    """Servicio en otro proceso y clientes por un socket Unix temporal, sin broker."""
+
+    authkey = b"pruebas"
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.address = os.path.join(directory.name, "inferencia.sock")
+
+    def iniciar_servidor(self, classifier="BrilloClassifier"):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE="Leaftech.settings")
+        server = subprocess.Popen(
+            [sys.executable, "-c", "import django; django.setup()\n" + SERVIDOR_DE_PRUEBA, self.address, classifier],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            env=env,
+        )
+        self.addCleanup(server.wait)
+        self.addCleanup(server.kill)
+        for _ in range(300):
+            if os.path.exists(self.address):
+                return server
+            time.sleep(0.05)
+        self.fail("El servicio de inferencia no arrancó")
+
+    def test_clasifica_por_memoria_compartida_y_agrupa_clientes(self):
+        self.iniciar_servidor()
+        clientes = [RemotePlantClassifier(self.address, self.authkey, slots=8) for _ in range(2)]
+        for cliente in clientes:
+            self.addCleanup(cliente.close)
+
+        # Imágenes de distinto tamaño: el cliente las redimensiona en el anillo
+        lotes = [
+            [np.full((50 + i, 80, 3), 10 * i + c, np.uint8) for i in range(5)]
+            for c in range(2)
+        ]
+        resultados = [None, None]
+        listos = threading.Barrier(2)
+
+        def clasificar(c):
+            listos.wait()
+            resultados[c] = clientes[c].classify_batch(lotes[c])
+
+        hilos = [threading.Thread(target=clasificar, args=(c,)) for c in range(2)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join(10)
+
+        for c in range(2):
+            self.assertEqual([label for label, _ in resultados[c]], [str(10 * i + c) for i in range(5)])
+        # Las peticiones de ambos clientes comparten una pasada del modelo
+        self.assertEqual({lote for _, lote in resultados[0] + resultados[1]}, {10.0})
+
+    def test_lote_mayor_que_el_anillo(self):
+        self.iniciar_servidor()
+        cliente = RemotePlantClassifier(self.address, self.authkey, slots=4)
+        self.addCleanup(cliente.close)
+        images = [np.full((64, 64, 3), i, np.uint8) for i in range(11)]
+        self.assertEqual([label for label, _ in cliente.classify_batch(images)], [str(i) for i in range(11)])
+
+    def test_servicio_que_muere_durante_la_peticion(self):
+        server = self.iniciar_servidor("ColgadoClassifier")
+        # Anillo de 4 slots y 11 imágenes: el segundo envío espera un slot libre
+        cliente = RemotePlantClassifier(self.address, self.authkey, slots=4, timeout=30)
+        self.addCleanup(cliente.close)
+        errores = []
+
+        def clasificar():
+            try:
+                cliente.classify_batch([np.full((64, 64, 3), i, np.uint8) for i in range(11)])
+            except Exception as e:
+                errores.append(e)
+
+        hilo = threading.Thread(target=clasificar)
+        hilo.start()
+        time.sleep(0.5)
+        server.kill()
+        hilo.join(10)
+
+        self.assertFalse(hilo.is_alive())
+        self.assertEqual(len(errores), 1)
+        self.assertIsInstance(errores[0], ConnectionError)
+        # Sin slots reservados ni peticiones colgadas
+        self.assertEqual(cliente._free, cliente.slots)
+        self.assertEqual(cliente._pending, {})
+
+    def test_servicio_colgado_agota_el_tiempo_de_espera(self):
+        self.iniciar_servidor("ColgadoClassifier")
+        cliente = RemotePlantClassifier(self.address, self.authkey, slots=4, timeout=0.5)
+        self.addCleanup(cliente.close)
+        inicio = time.monotonic()
+        with self.assertRaises(ConnectionError):
+            cliente.classify(np.zeros((64, 64, 3), np.uint8))
+        self.assertLess(time.monotonic() - inicio, 5)
+        # Se cortó la conexión: sus slots vuelven al anillo
+        for _ in range(100):
+            if cliente.conn is None:
+                break
+            time.sleep(0.05)
+        self.assertIsNone(cliente.conn)
+        self.assertEqual(cliente._free, cliente.slots)
+        self.assertEqual(cliente._pending, {})
+
+    def test_servicio_caido_no_deja_segmentos_de_memoria(self):
+        antes = segmentos_shm()
+        for _ in range(20):
+            with self.assertRaises(OSError):
+                RemotePlantClassifier(self.address, self.authkey, slots=64)
+        self.assertEqual(segmentos_shm() - antes, set())
+
+    def test_no_reintenta_en_cada_frame_tras_un_fallo(self):
+        intentos = []
+
+        def build_classifier():
+            intentos.append(1)
+            return RemotePlantClassifier(self.address, self.authkey, slots=64)
+
+        antes = segmentos_shm()
+        with mock.patch.object(classifier_factory, "build_classifier", build_classifier), \
+                mock.patch.object(classifier_factory, "_estado", {"estado": "sin_cargar", "error": None}), \
+                mock.patch.object(classifier_factory, "_reintento", {"desde": 0.0}):
+            for _ in range(20):
+                with self.assertRaises(Exception):
+                    classifier_factory.get_classifier()
+        self.assertEqual(len(intentos), 1)
+        self.assertEqual(segmentos_shm() - antes, set())
+
+
+def cache_de_archivos(test):
+    """Caché de archivos en un directorio temporal, como el alias 'resultados' sin Redis."""
+    directory = tempfile.TemporaryDirectory()
+    test.addCleanup(directory.cleanup)
+    return directory.name, FileBasedCache(directory.name, {})
+
+
+COLOR_SANO = {'verde': 90.0, 'amarillo': 5.0, 'marron': 3.0, 'rojo': 2.0, 'estado': 1, 'descripcion': 'Sana'}
+
+
+class VariosEscritoresTests(SimpleTestCase):
+    """Frames de un mismo stream subidos a distintos workers (dos almacenes, un caché)."""
+
+    def test_frame_sin_color_no_pisa_el_color_de_otro_worker(self):
+        _, cache = cache_de_archivos(self)
+        worker_a = DetectionResultStore(cache)
+        worker_b = DetectionResultStore(cache)
+
+        worker_a.update("movil", {"label": "Monstera", "prob": 0.9}, COLOR_SANO)
+        record = worker_b.update("movil", {"label": "Monstera", "prob": 0.95}, None)
+
+        self.assertEqual(record["color"], COLOR_SANO)
+        self.assertEqual(worker_a.get("movil"), ({"label": "Monstera", "prob": 0.95}, COLOR_SANO))
+
+    def test_frame_sin_hoja_no_pisa_el_resultado_de_otro_worker(self):
+        _, cache = cache_de_archivos(self)
+        worker_a = DetectionResultStore(cache)
+        worker_b = DetectionResultStore(cache)
+
+        worker_a.update("movil", {"label": "Monstera", "prob": 0.9}, None)
+        worker_b.update("movil", None, COLOR_SANO)
+
+        self.assertEqual(worker_a.get("movil"), ({"label": "Monstera", "prob": 0.9}, COLOR_SANO))
+
+    def test_valor_que_volvio_a_cambiar_en_otro_worker_se_reescribe(self):
+        _, cache = cache_de_archivos(self)
+        worker_a = DetectionResultStore(cache)
+        worker_b = DetectionResultStore(cache)
+
+        worker_a.update("movil", {"label": "Monstera", "prob": 0.9})
+        worker_b.update("movil", {"label": "Pothos", "prob": 0.9})
+        worker_a.update("movil", {"label": "Monstera", "prob": 0.9})
+
+        self.assertEqual(worker_b.get("movil")[0]["label"], "Monstera")
+        self.assertEqual(worker_b.get("movil")[1], DEFAULT_COLOR)
+
+    def test_un_solo_worker_analiza_el_stream_a_la_vez(self):
+        _, cache = cache_de_archivos(self)
+        en_analisis = threading.Event()
+        seguir = threading.Event()
+
+        class Lento:
+            def execute(self, frame):
+                en_analisis.set()
+                seguir.wait(5)
+                return {"result": None, "color": None, "detections": []}
+
+        workers = [
+            LatestFrameAnalysisUseCase(Lento, lambda data: np.zeros((4, 4, 3), np.uint8), lease=StreamLease(cache))
+            for _ in range(2)
+        ]
+        resultados = {}
+        hilo = threading.Thread(target=lambda: resultados.setdefault("a", workers[0].execute("movil", b"jpeg")))
+        hilo.start()
+        self.assertTrue(en_analisis.wait(5))
+
+        self.assertIsNone(workers[1].execute("movil", b"jpeg"))
+        self.assertEqual(workers[1].stats()["frames_dropped"], 1)
+        seguir.set()
+        hilo.join(5)
+        self.assertIsNotNone(resultados["a"])
+        # Liberada la marca, el otro worker ya puede analizar el stream
+        self.assertIsNotNone(workers[1].execute("movil", b"jpeg"))
+
+
+OTRO_WORKER = """
+import json, sys
+from django.core.cache.backends.filebased import FileBasedCache
+from clasificador.infraestructure.result_store import DetectionResultStore
+store = DetectionResultStore(FileBasedCache(sys.argv[1], {}))
+if sys.argv[2] == "escribir":
+    store.update("camara", json.loads(sys.argv[3]), None)
+else:
+    print(json.dumps(store.get("camara")[0]))
+"""
+
+
+class ResultadosEntreProcesosTests(SimpleTestCase):
+    """El almacén de resultados visto desde otro proceso (otro worker de gunicorn)."""
+
+    def otro_worker(self, directory, *args):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE="Leaftech.settings")
+        salida = subprocess.run(
+            [sys.executable, "-c", "import django; django.setup()\n" + OTRO_WORKER, directory, *args],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            env=env, capture_output=True, text=True, check=True, timeout=60,
+        )
+        return salida.stdout
+
+    def test_lo_escrito_en_otro_proceso_se_lee_aqui(self):
+        directory, cache = cache_de_archivos(self)
+        store = DetectionResultStore(cache)
+        self.assertEqual(store.get("camara")[0]["label"], "Detectando...")
+
+        self.otro_worker(directory, "escribir", json.dumps({"label": "Pothos", "prob": 0.8}))
+        self.assertEqual(store.get("camara")[0], {"label": "Pothos", "prob": 0.8})
+
+    def test_lo_escrito_aqui_se_lee_en_otro_proceso(self):
+        directory, cache = cache_de_archivos(self)
+        DetectionResultStore(cache).update("camara", {"label": "Monstera", "prob": 0.9}, COLOR_SANO)
+        self.assertEqual(json.loads(self.otro_worker(directory, "leer")), {"label": "Monstera", "prob": 0.9})
+
+    def test_el_resultado_caduca(self):
+        _, cache = cache_de_archivos(self)
+        store = DetectionResultStore(cache, ttl=0.2)
+        store.update("camara", {"label": "Monstera", "prob": 0.9})
+        time.sleep(1.1)
+        self.assertEqual(store.get("camara")[0]["label"], "Detectando...")
+
+
+class CapturaFalsa:
+    """Sustituto de cv2.VideoCapture: frames numerados (el número es el brillo) a ~200 fps."""
+
+    def __init__(self, aperturas):
+        aperturas.append(self)
+        self.frames = 0
+        self.released = False
+
+    def isOpened(self):
+        return not self.released
+
+    def set(self, prop, value):
+        return True
+
+    def read(self):
+        if self.released:
+            return False, None
+        time.sleep(0.005)
+        self.frames += 1
+        return True, np.full((48, 64, 3), self.frames % 256, np.uint8)
+
+    def release(self):
+        self.released = True
+
+
+class AnalizadorFalso:
+    def __init__(self):
+        self.frames = 0
+
+    def execute(self, frame):
+        self.frames += 1
+        return {"frame": frame, "result": None, "color": None, "detections": []}
+
+
+def numero_de_frame(jpeg):
+    return int(round(float(cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_GRAYSCALE).mean())))
+
+
+class VideoPipelineTests(SimpleTestCase):
+    def setUp(self):
+        self.aperturas = []
+        self.pipeline = VideoPipeline(
+            "falsa",
+            lambda source: LatestFrameCamera(source, width=64, height=48,
+                                             capture_factory=lambda _: CapturaFalsa(self.aperturas)),
+            AnalizadorFalso,
+            idle_timeout=0.1,
+        )
+
+    def test_camara_detenida_sale_del_reparto_del_presupuesto(self):
+        scheduler = FairInferenceScheduler(10)
+
+        def build_analyzer():
+            scheduler.register("falsa")
+            return AnalizadorFalso()
+
+        self.pipeline.analyzer_factory = build_analyzer
+        self.pipeline.on_stop = lambda: scheduler.unregister("falsa")
+
+        suscripcion = self.pipeline.subscribe()
+        next(suscripcion)
+        self.assertIn("falsa", scheduler.stats()["sources"])
+        suscripcion.close()
+        self.esperar(lambda: self.pipeline.camera is None)
+        self.assertNotIn("falsa", scheduler.stats()["sources"])
+
+    def esperar(self, condicion, timeout=5.0):
+        limite = time.monotonic() + timeout
+        while not condicion():
+            if time.monotonic() > limite:
+                self.fail("Tiempo de espera agotado")
+            time.sleep(0.01)
+
+    def test_una_captura_compartida_por_varios_espectadores(self):
+        suscripciones = [self.pipeline.subscribe() for _ in range(3)]
+        for suscripcion in suscripciones:
+            for _ in range(5):
+                self.assertIsNotNone(next(suscripcion))
+        for suscripcion in suscripciones:
+            suscripcion.close()
+        self.esperar(lambda: self.pipeline.camera is None)
+
+        self.assertEqual(len(self.aperturas), 1)
+        # Cada frame se analizó una sola vez, no una por espectador
+        self.assertEqual(self.pipeline.analyzer.frames, self.pipeline.frames_published)
+
+    def test_espectador_lento_recibe_solo_el_frame_mas_nuevo(self):
+        rapido = self.pipeline.subscribe()
+        lento = self.pipeline.subscribe()
+        next(lento)
+        recibidos = 0
+        for _ in range(20):
+            next(rapido)
+            recibidos += 1
+
+        # Sin cola atrasada: el siguiente frame del lento es el último publicado
+        with self.pipeline._cond:
+            ultimo = self.pipeline._jpeg
+        frame = next(lento)
+        self.assertGreaterEqual(numero_de_frame(frame), numero_de_frame(ultimo))
+        self.assertGreater(numero_de_frame(frame), 10)
+        rapido.close()
+        lento.close()
+
+    def test_libera_la_camara_al_irse_el_ultimo_espectador(self):
+        a = self.pipeline.subscribe()
+        b = self.pipeline.subscribe()
+        next(a)
+        next(b)
+        a.close()
+        time.sleep(0.3)
+        # Queda un espectador: la cámara sigue abierta
+        self.assertTrue(self.pipeline.running)
+        self.assertFalse(self.aperturas[0].released)
+
+        b.close()
+        # camera vuelve a None después de liberar el dispositivo
+        self.esperar(lambda: self.pipeline.camera is None)
+        self.assertFalse(self.pipeline.running)
+        self.assertTrue(self.aperturas[0].released)
+
+        # Un espectador nuevo vuelve a abrir el dispositivo
+        c = self.pipeline.subscribe()
+        next(c)
+        c.close()
+        self.assertEqual(len(self.aperturas), 2)
+
+
+class CameraSourcesTests(SimpleTestCase):
+    def test_tipos_de_fuente(self):
+        video = tempfile.NamedTemporaryFile(suffix=".avi")
+        self.addCleanup(video.close)
+        fuentes = parse_sources(f"a=0;b=/dev/video2|2;c=rtsp://u:p@10.0.0.5/s;d={video.name}")
+        self.assertEqual(
+            [(f.name, f.kind, f.priority) for f in fuentes],
+            [("a", "device", 1), ("b", "device", 2), ("c", "url", 1), ("d", "file", 1)],
+        )
+        self.assertNotIsInstance(fuentes[1].open(), LoopingFileCapture)
+        self.assertIsInstance(fuentes[3].open(), LoopingFileCapture)
+
+    def test_video_inexistente(self):
+        with self.assertRaises(ValueError):
+            parse_sources("prueba=/no/existe.mp4")
+
+
+def mascaras_originales(imageHSV):
+    """Máscaras con los rangos completos de tres canales, como antes de compartir S/V."""
+    rangos = {
+        'verde': [([36, 25, 25], [86, 255, 255])],
+        'amarillo': [([20, 100, 20], [35, 255, 255])],
+        'marron': [([8, 40, 40], [20, 255, 200])],
+        'rojo': [([0, 100, 20], [10, 255, 255]), ([175, 100, 20], [180, 255, 255])],
+    }
+    masks = {}
+    for color, tramos in rangos.items():
+        mask = None
+        for bajo, alto in tramos:
+            tramo = cv2.inRange(imageHSV, np.array(bajo, np.uint8), np.array(alto, np.uint8))
+            mask = tramo if mask is None else cv2.add(mask, tramo)
+        masks[color] = mask
+    return masks
+
+
+class ColorAnalyzerTests(SimpleTestCase):
+    """La máscara S/V compartida da exactamente las máscaras de los rangos originales."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Los 2^24 valores posibles de un píxel, uno por píxel (4096x4096)
+        todos = np.arange(1 << 24, dtype=np.uint32)
+        cls.todos = np.stack([todos >> 16, (todos >> 8) & 255, todos & 255], axis=-1).astype(np.uint8).reshape(4096, 4096, 3)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls.todos
+        super().tearDownClass()
+
+    def comparar(self, frame, imageHSV):
+        resultado = ColorAnalyzer.detectar_colores_frame(frame)
+        total = imageHSV.shape[0] * imageHSV.shape[1]
+        for color, esperada in mascaras_originales(imageHSV).items():
+            with self.subTest(color=color):
+                np.testing.assert_array_equal(resultado['masks'][color], esperada)
+                self.assertEqual(resultado[color], round(cv2.countNonZero(esperada) / total * 100, 2))
+
+    def test_todas_las_ternas_hsv(self):
+        # Sin la conversión: la imagen ya contiene cada terna HSV
+        with mock.patch.object(cv2, "cvtColor", lambda frame, code: frame):
+            self.comparar(self.todos, self.todos)
+
+    def test_todos_los_colores_bgr(self):
+        self.comparar(self.todos, cv2.cvtColor(self.todos, cv2.COLOR_BGR2HSV))
+
+
+class LeafTrackerTests(SimpleTestCase):
+    """Secuencias de cajas guionadas, frame a frame."""
+
+    def ids(self, tracker, bboxes):
+        return [track.id for track in tracker.update(bboxes)]
+
+    def test_la_caja_que_se_mueve_conserva_su_id(self):
+        tracker = LeafTracker()
+        (primero,) = self.ids(tracker, [(100, 100, 50, 50)])
+        for paso in range(1, 6):
+            self.assertEqual(self.ids(tracker, [(100 + 5 * paso, 100 + 3 * paso, 50, 50)]), [primero])
+        self.assertEqual(tracker.tracks[0].hits, 6)
+
+    def test_caja_nueva_recibe_id_nuevo(self):
+        tracker = LeafTracker()
+        (a,) = self.ids(tracker, [(100, 100, 50, 50)])
+        a2, b = self.ids(tracker, [(102, 100, 50, 50), (400, 300, 60, 60)])
+        self.assertEqual(a2, a)
+        self.assertNotEqual(b, a)
+        self.assertEqual(len(tracker.tracks), 2)
+
+    def test_emparejamiento_voraz_por_mayor_iou(self):
+        tracker = LeafTracker()
+        (a,) = self.ids(tracker, [(100, 100, 50, 50)])
+        # Las dos solapan con el track: se lo queda la de mayor IoU
+        lejos, cerca = self.ids(tracker, [(120, 100, 50, 50), (101, 100, 50, 50)])
+        self.assertEqual(cerca, a)
+        self.assertNotEqual(lejos, a)
+
+    def test_track_perdido_caduca_tras_max_missed_frames(self):
+        tracker = LeafTracker(max_missed=2)
+        (a,) = self.ids(tracker, [(100, 100, 50, 50)])
+        self.ids(tracker, [])
+        self.ids(tracker, [])
+        # Perdido dos frames: sigue vivo y la hoja que reaparece recupera su id
+        self.assertEqual(self.ids(tracker, [(100, 100, 50, 50)]), [a])
+
+        for _ in range(3):
+            self.ids(tracker, [])
+        self.assertEqual(tracker.tracks, [])
+        self.assertNotEqual(self.ids(tracker, [(100, 100, 50, 50)]), [a])
+
+    def test_resultado_suavizado_sigue_la_ventana(self):
+        tracker = LeafTracker(window=3)
+        (track,) = tracker.update([(100, 100, 50, 50)])
+        self.assertIsNone(track.result)
+
+        tracker.add_result(track, {"label": "Monstera", "prob": 0.9})
+        tracker.add_result(track, {"label": "Pothos", "prob": 0.6})
+        tracker.add_result(track, {"label": "Pothos", "prob": 0.7})
+        # Pothos acumula 1.3 frente a 0.9: gana con su probabilidad media
+        self.assertEqual(track.result["label"], "Pothos")
+        self.assertAlmostEqual(track.result["prob"], 0.65)
+
+        tracker.add_result(track, {"label": "Monstera", "prob": 0.8})
+        tracker.add_result(track, {"label": "Monstera", "prob": 0.9})
+        # La ventana de 3 ya descartó los dos primeros resultados
+        self.assertEqual(track.result["label"], "Monstera")
+        self.assertAlmostEqual(track.result["prob"], 0.85)
+
+    def test_reclasifica_cada_n_frames(self):
+        tracker = LeafTracker(reclassify_every=3)
+        clasificados = []
+        for frame in range(1, 8):
+            (track,) = tracker.update([(100, 100, 50, 50)])
+            if tracker.needs_classification(track):
+                tracker.add_result(track, {"label": "Monstera", "prob": 0.9})
+                clasificados.append(frame)
+        self.assertEqual(clasificados, [1, 4, 7])
+
+
+def escena_con_hoja(x, ruido=None):
+    """Fondo gris con un cuadrado verde en la columna `x`, con ruido opcional."""
+    frame = np.full((240, 320, 3), 90, np.uint8)
+    frame[80:160, x:x + 80] = (40, 160, 50)
+    if ruido is not None:
+        frame = np.clip(frame + ruido.normal(0, 2, frame.shape), 0, 255).astype(np.uint8)
+    return frame
+
+
+class DetectorFijo:
+    def __init__(self):
+        self.llamadas = 0
+
+    def detect(self, frame):
+        self.llamadas += 1
+        return [(None, (40, 80, 80, 80))]
+
+
+class ClasificacionFalsa:
+    def __init__(self):
+        self.recortes = 0
+
+    def execute_batch(self, crops):
+        self.recortes += len(crops)
+        return [{"label": "Monstera", "prob": 0.9} for _ in crops]
+
+
+class MotionGateTests(SimpleTestCase):
+    def test_frames_iguales_se_reutilizan(self):
+        gate = MotionGate()
+        ruido = np.random.default_rng(0)
+        decisiones = [gate.should_analyze(escena_con_hoja(40, ruido)) for _ in range(10)]
+        # Solo el primero fija la referencia; el ruido del sensor no dispara el análisis
+        self.assertEqual(decisiones, [True] + [False] * 9)
+        self.assertEqual(gate.skipped, 9)
+        self.assertAlmostEqual(gate.skip_ratio, 0.9)
+
+    def test_frame_que_cambia_se_analiza(self):
+        gate = MotionGate()
+        self.assertTrue(gate.should_analyze(escena_con_hoja(40)))
+        self.assertFalse(gate.should_analyze(escena_con_hoja(40)))
+        self.assertTrue(gate.should_analyze(escena_con_hoja(60)))
+        # La referencia pasa a ser el frame nuevo
+        self.assertFalse(gate.should_analyze(escena_con_hoja(60)))
+
+    def test_cambio_lento_se_acumula_contra_la_referencia(self):
+        gate = MotionGate()
+        decisiones = [gate.should_analyze(escena_con_hoja(40 + x)) for x in range(0, 12)]
+        # Un píxel por frame no alcanza el umbral, pero el desplazamiento acumulado sí
+        self.assertEqual(decisiones[:2], [True, False])
+        self.assertIn(True, decisiones[2:])
+
+    def test_refresco_forzado_cada_refresh_every_frames(self):
+        gate = MotionGate(refresh_every=5)
+        decisiones = [gate.should_analyze(escena_con_hoja(40)) for _ in range(11)]
+        self.assertEqual(decisiones, [True, False, False, False, False] * 2 + [True])
+
+    def test_reset_fuerza_el_proximo_analisis(self):
+        gate = MotionGate()
+        gate.should_analyze(escena_con_hoja(40))
+        gate.reset()
+        self.assertTrue(gate.should_analyze(escena_con_hoja(40)))
+
+    def test_estadisticas_del_caso_de_uso(self):
+        detector = DetectorFijo()
+        clasificacion = ClasificacionFalsa()
+        usecase = AnalyzeFrameUseCase(
+            clasificacion, ColorAnalyzer(), detector, LeafTracker(), draw=False,
+            motion_gate=MotionGate(refresh_every=100),
+        )
+        frames = [escena_con_hoja(40)] * 6 + [escena_con_hoja(80)] * 4
+        analisis = [usecase.execute(frame.copy()) for frame in frames]
+
+        stats = usecase.stats()
+        self.assertEqual(stats["frames_analyzed"], 2)
+        self.assertEqual(stats["frames_reused"], 8)
+        self.assertEqual(stats["frames_throttled"], 0)
+        self.assertAlmostEqual(stats["skip_ratio"], 0.8)
+        # Solo los frames analizados llegan al detector
+        self.assertEqual(detector.llamadas, 2)
+        # Los reutilizados repiten las detecciones y el resultado del último análisis
+        self.assertEqual(analisis[3]["detections"], analisis[0]["detections"])
+        self.assertEqual(analisis[3]["result"], {"label": "Monstera", "prob": 0.9})
+
+
+class ModeloFalso(PlantClassifierPort):
+    """Clasificador de una versión del registro: etiqueta todo con el contenido de su archivo."""
+
+    def __init__(self, model_path, labels_path):
+        with open(model_path) as f:
+            self.nombre = f.read()
+        if self.nombre == "roto":
+            raise ValueError("modelo corrupto")
+
+    def classify(self, image):
+        return self.classify_batch([image])[0]
+
+    def classify_batch(self, images):
+        return [(self.nombre, 1.0) for _ in images]
+
+
+class ModelRegistryTests(SimpleTestCase):
+    """Registro en un directorio temporal con modelos falsos (el archivo del modelo es su nombre)."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = os.path.join(directory.name, "modelos")
+        self.origen = directory.name
+        self.registry = ModelRegistry(self.root)
+        self.cargas = []
+
+    def agregar(self, version, contenido=None):
+        model_path = os.path.join(self.origen, f"{version}.h5")
+        labels_path = os.path.join(self.origen, f"{version}.pkl")
+        with open(model_path, "w") as f:
+            f.write(contenido or version)
+        with open(labels_path, "w") as f:
+            f.write("")
+        self.registry.add(version, model_path, labels_path)
+
+    def loader(self, model_path, labels_path):
+        self.cargas.append(os.path.basename(os.path.dirname(model_path)))
+        return ModeloFalso(model_path, labels_path)
+
+    def etiqueta(self, classifier):
+        return classifier.classify(np.zeros((8, 8, 3), np.uint8))[0]
+
+    def esperar_version(self, classifier, version):
+        for _ in range(200):
+            # classify revisa el puntero y, si cambió, lanza la carga en segundo plano
+            self.etiqueta(classifier)
+            if classifier.version == version and classifier._loading is None:
+                return
+            time.sleep(0.01)
+        self.fail(f"No se activó la versión {version}")
+
+    def test_agregar_activar_y_volver(self):
+        self.agregar("v1")
+        self.agregar("v2")
+        self.assertFalse(self.registry.exists())
+        self.assertEqual(self.registry.versions(), ["v1", "v2"])
+        with self.assertRaises(ValueError):
+            self.agregar("v1")
+
+        self.registry.activate("v1")
+        self.registry.activate("v2")
+        self.assertEqual(self.registry.active_version(), "v2")
+        self.assertEqual(self.registry.history(), ["v1"])
+
+        self.assertEqual(self.registry.rollback(), "v1")
+        self.assertEqual(self.registry.active_version(), "v1")
+        self.assertEqual(self.registry.history(), [])
+
+    def test_rollback_sin_version_anterior(self):
+        self.agregar("v1")
+        self.registry.activate("v1")
+        with self.assertRaises(ValueError):
+            self.registry.rollback()
+        self.assertEqual(self.registry.active_version(), "v1")
+
+    def test_activar_version_inexistente(self):
+        with self.assertRaises(FileNotFoundError):
+            self.registry.activate("v9")
+        self.assertFalse(self.registry.exists())
+
+    def test_get_classifier_cambia_de_version_en_caliente(self):
+        self.agregar("v1")
+        self.agregar("v2")
+        self.registry.activate("v1")
+        with override_settings(CLASIFICADOR_REGISTRY_DIR=self.root, CLASIFICADOR_REGISTRY_POLL=0), \
+                mock.patch.object(classifier_factory, "_build_local", lambda backend, model_path, labels_path, *_: self.loader(model_path, labels_path)), \
+                mock.patch.object(classifier_factory, "_classifier", None), \
+                mock.patch.object(classifier_factory, "_estado", {"estado": "sin_cargar", "error": None}):
+            classifier = classifier_factory.get_classifier()
+            self.assertIsInstance(classifier, HotSwapPlantClassifier)
+            self.assertEqual(self.etiqueta(classifier), "v1")
+
+            self.registry.activate("v2")
+            self.esperar_version(classifier, "v2")
+            # El mismo objeto del proceso sirve ya la versión nueva
+            self.assertIs(classifier_factory.get_classifier(), classifier)
+            self.assertEqual(self.etiqueta(classifier), "v2")
+            self.assertEqual(classifier_factory.classifier_status()["version"], "v2")
+
+            self.registry.rollback()
+            self.esperar_version(classifier, "v1")
+            self.assertEqual(self.etiqueta(classifier), "v1")
+
+    def test_version_que_no_carga_no_se_reintenta(self):
+        self.agregar("v1")
+        self.agregar("v2", "roto")
+        self.agregar("v3")
+        self.registry.activate("v1")
+        classifier = HotSwapPlantClassifier(self.registry, self.loader, poll_interval=0)
+
+        self.registry.activate("v2")
+        for _ in range(50):
+            self.assertEqual(self.etiqueta(classifier), "v1")
+            time.sleep(0.005)
+        # Se intentó una vez y se sigue con el modelo anterior
+        self.assertEqual(self.cargas, ["v1", "v2"])
+        self.assertEqual(classifier.version, "v1")
+
+        # Otra versión sí se carga
+        self.registry.activate("v3")
+        self.esperar_version(classifier, "v3")
+        self.assertEqual(self.cargas, ["v1", "v2", "v3"])
+
+    def test_activa_que_no_carga_al_arrancar_usa_la_anterior(self):
+        self.agregar("v1")
+        self.agregar("v2", "roto")
+        self.registry.activate("v1")
+        self.registry.activate("v2")
+        classifier = HotSwapPlantClassifier(self.registry, self.loader, poll_interval=0)
+
+        self.assertEqual(classifier.version, "v1")
+        for _ in range(10):
+            self.assertEqual(self.etiqueta(classifier), "v1")
+        self.assertEqual(self.cargas, ["v2", "v1"])
+
+    def test_ninguna_version_carga(self):
+        self.agregar("v1", "roto")
+        self.registry.activate("v1")
+        with self.assertRaises(RuntimeError):
+            HotSwapPlantClassifier(self.registry, self.loader)
+
+
+class EtiquetaPorEntrada:
+    """Caso de uso falso: anota el tamaño de cada lote y etiqueta cada entrada con su valor."""
+
+    def __init__(self, falla_con=None):
+        self.lotes = []
+        self.falla_con = falla_con
+        self.en_curso = threading.Event()
+        self.seguir = threading.Event()
+        self.seguir.set()
+
+    def execute_batch(self, images):
+        self.lotes.append(len(images))
+        self.en_curso.set()
+        self.seguir.wait(5)
+        if self.falla_con is not None and self.falla_con in images:
+            raise ValueError(f"entrada inválida: {self.falla_con}")
+        return [{"label": f"entrada-{image}", "prob": 1.0} for image in images]
+
+
+class MicroBatchSchedulerTests(SimpleTestCase):
+    def enviar_en_paralelo(self, scheduler, peticiones):
+        """Una petición por hilo, todas a la vez; devuelve resultado o excepción de cada una."""
+        salidas = [None] * len(peticiones)
+        listos = threading.Barrier(len(peticiones))
+
+        def cliente(i):
+            listos.wait()
+            try:
+                salidas[i] = scheduler.execute_batch(peticiones[i])
+            except Exception as e:
+                salidas[i] = e
+
+        hilos = [threading.Thread(target=cliente, args=(i,)) for i in range(len(peticiones))]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join(10)
+        return salidas
+
+    def test_cada_llamador_recibe_sus_resultados(self):
+        usecase = EtiquetaPorEntrada()
+        scheduler = MicroBatchScheduler(usecase, max_batch_size=64, max_wait=0.2)
+        self.addCleanup(scheduler.close)
+        peticiones = [[10 * c + i for i in range(c % 3 + 1)] for c in range(8)]
+
+        salidas = self.enviar_en_paralelo(scheduler, peticiones)
+
+        for peticion, salida in zip(peticiones, salidas):
+            self.assertEqual([r["label"] for r in salida], [f"entrada-{i}" for i in peticion])
+        # Las peticiones concurrentes compartieron pasadas del modelo
+        self.assertEqual(sum(usecase.lotes), sum(len(p) for p in peticiones))
+        self.assertLess(len(usecase.lotes), len(peticiones))
+
+    def test_respeta_el_tamano_maximo_de_lote(self):
+        usecase = EtiquetaPorEntrada()
+        scheduler = MicroBatchScheduler(usecase, max_batch_size=4, max_wait=0.2)
+        self.addCleanup(scheduler.close)
+        salidas = self.enviar_en_paralelo(scheduler, [[i] for i in range(12)])
+        self.assertEqual([s[0]["label"] for s in salidas], [f"entrada-{i}" for i in range(12)])
+        self.assertTrue(all(lote <= 4 for lote in usecase.lotes))
+
+    def test_la_excepcion_llega_a_todo_el_lote_que_fallo(self):
+        usecase = EtiquetaPorEntrada(falla_con=3)
+        scheduler = MicroBatchScheduler(usecase, max_batch_size=64, max_wait=0.2)
+        self.addCleanup(scheduler.close)
+        # El modelo queda ocupado con un primer lote mientras se encolan los demás
+        usecase.seguir.clear()
+        primero = scheduler.submit([100])
+        self.assertTrue(usecase.en_curso.wait(5))
+        futuros = [scheduler.submit([i]) for i in range(5)]
+        usecase.seguir.set()
+
+        self.assertEqual(primero.result(5), [{"label": "entrada-100", "prob": 1.0}])
+        for futuro in futuros:
+            with self.assertRaises(ValueError):
+                futuro.result(5)
+        self.assertEqual(usecase.lotes, [1, 5])
+        # El hilo sigue atendiendo peticiones después del fallo
+        self.assertEqual(scheduler.execute(7), {"label": "entrada-7", "prob": 1.0})
+
+    def test_cierre_no_deja_futuros_colgados(self):
+        usecase = EtiquetaPorEntrada()
+        scheduler = MicroBatchScheduler(usecase, max_batch_size=2, max_wait=0.01)
+        usecase.seguir.clear()
+        futuros = [scheduler.submit([i]) for i in range(7)]
+        self.assertTrue(usecase.en_curso.wait(5))
+
+        cierre = threading.Thread(target=scheduler.close)
+        cierre.start()
+        usecase.seguir.set()
+        cierre.join(5)
+        self.assertFalse(cierre.is_alive())
+
+        # Lo encolado antes del cierre se resolvió; lo posterior se rechaza al instante
+        self.assertEqual([f.result(0)[0]["label"] for f in futuros], [f"entrada-{i}" for i in range(7)])
+        with self.assertRaises(RuntimeError):
+            scheduler.submit([8]).result(0)
+        self.assertFalse(scheduler._thread.is_alive())
+
+    def test_cierre_sin_peticiones(self):
+        scheduler = MicroBatchScheduler(EtiquetaPorEntrada())
+        scheduler.close()
+        with self.assertRaises(RuntimeError):
+            scheduler.execute(1)
+
+
+class TensorflowCompiladoTests(SimpleTestCase):
+    """La ruta compilada con entrada uint8 da lo mismo que model.predict sobre el modelo cargado."""
+
+    TOLERANCIA = 1e-5
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # TensorFlow se importa solo aquí: el resto de las pruebas no lo necesita
+        import tensorflow as tf
+        from clasificador.infraestructure.tf_classifier import TensorflowPlantClassifier
+
+        cls.directory = tempfile.TemporaryDirectory()
+        model_path, labels_path = modelo_dummy(cls.directory.name, seed=0)
+        cls.classifier = TensorflowPlantClassifier(model_path, labels_path)
+        cls.original = tf.keras.models.load_model(model_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+        super().tearDownClass()
+
+    def recortes(self, n):
+        rng = np.random.default_rng(n)
+        return [rng.integers(0, 256, (int(rng.integers(60, 200)), int(rng.integers(60, 200)), 3), dtype=np.uint8)
+                for _ in range(n)]
+
+    def test_misma_salida_que_predict(self):
+        # 10 supera la capacidad inicial del buffer (8)
+        for n in (1, 6, 10):
+            with self.subTest(lote=n):
+                batch = BatchBuffer().fill(self.recortes(n))
+                compilado = self.classifier._infer(batch).numpy()
+                esperado = self.original.predict(batch.astype(np.float32) / 255.0, verbose=0)
+                np.testing.assert_allclose(compilado, esperado, rtol=0, atol=self.TOLERANCIA)
+
+    def test_classify_batch_igual_que_la_ruta_anterior(self):
+        crops = self.recortes(6)
+        resultados = self.classifier.classify_batch(crops)
+        for crop, (label, prob) in zip(crops, resultados):
+            # Ruta previa: redimensionar, normalizar en el host y model.predict de a una imagen
+            img = cv2.resize(crop, INPUT_SIZE).astype(np.float32)[np.newaxis] / 255.0
+            pred = self.original.predict(img, verbose=0)[0]
+            self.assertEqual(label, self.classifier.labels[int(np.argmax(pred))])
+            self.assertAlmostEqual(float(prob), float(np.max(pred)), delta=self.TOLERANCIA)
+
+
+class ResultBroadcasterTests(SimpleTestCase):
+    def test_publicar_desde_otro_hilo_despierta_al_stream(self):
+        events = ResultBroadcaster({"label": "Detectando..."})
+
+        async def esperar():
+            threading.Timer(0.05, events.publish, args=({"label": "Monstera"},)).start()
+            return await events.wait_async(0, timeout=5)
+
+        inicio = time.monotonic()
+        self.assertEqual(asyncio.run(esperar()), (1, {"label": "Monstera"}))
+        self.assertLess(time.monotonic() - inicio, 2)
+        self.assertEqual(events._waiters, set())
+
+    def test_evento_repetido_no_avanza_la_version(self):
+        events = ResultBroadcaster({"label": "Detectando..."})
+        self.assertTrue(events.publish({"label": "Monstera"}))
+        self.assertFalse(events.publish({"label": "Monstera"}))
+        self.assertEqual(events.version, 1)
+        # Con una versión ya posterior a `since` vuelve sin esperar
+        self.assertEqual(asyncio.run(events.wait_async(0, timeout=5)), (1, {"label": "Monstera"}))
+        # Sin cambios vence el tiempo de espera y devuelve lo actual
+        self.assertEqual(asyncio.run(events.wait_async(1, timeout=0.05)), (1, {"label": "Monstera"}))
+
+
+class RelojFalso:
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+
+class FairInferenceSchedulerTests(SimpleTestCase):
+    """Dos cámaras a 30 fps con un presupuesto de 10 análisis/s y reloj simulado."""
+
+    presupuesto = 10
+
+    def repartir(self, pesos, llega=2.0, hasta=6.0, primera_ociosa=False, fps=30):
+        """
+        'banco' se registra en t=0 y 'otra' en t=`llega`. Cada una pide un
+        análisis por frame (banco no pide nada antes de `llega` si
+        `primera_ociosa`). Devuelve los análisis concedidos por segundo desde `llega`.
+        """
+        reloj = RelojFalso()
+        scheduler = FairInferenceScheduler(self.presupuesto, clock=reloj)
+        scheduler.register("banco", pesos[0])
+        segundos = int(hasta - llega)
+        concedidos = {"banco": [0] * segundos, "otra": [0] * segundos}
+        for frame in range(int(hasta * fps)):
+            reloj.ahora = frame / fps
+            activas = ["banco"]
+            if reloj.ahora >= llega:
+                if "otra" not in scheduler.stats()["sources"]:
+                    scheduler.register("otra", pesos[1])
+                activas.append("otra")
+            elif primera_ociosa:
+                activas = []
+            for fuente in activas:
+                if scheduler.try_acquire(fuente) and reloj.ahora >= llega:
+                    concedidos[fuente][int(reloj.ahora - llega)] += 1
+        return concedidos
+
+    def test_cada_fuente_recibe_su_parte_segun_el_peso(self):
+        for pesos in ((1, 2), (2, 1), (2, 2)):
+            for primera_ociosa in (False, True):
+                with self.subTest(pesos=pesos, primera_ociosa=primera_ociosa):
+                    concedidos = self.repartir(pesos, primera_ociosa=primera_ociosa)
+                    for fuente, peso in zip(("banco", "otra"), pesos):
+                        parte = self.presupuesto * peso / sum(pesos)
+                        # Pasado el primer segundo (ráfaga inicial), cada segundo sigue el peso
+                        for segundo in concedidos[fuente][1:]:
+                            self.assertAlmostEqual(segundo, parte, delta=1.5)
+
+    def test_la_fuente_que_llega_despues_no_espera_a_que_la_otra_gaste_su_rafaga(self):
+        # banco estuvo sola y sin pedir: tenía guardado un segundo de todo el presupuesto
+        for pesos in ((1, 2), (2, 1), (2, 2)):
+            with self.subTest(pesos=pesos):
+                concedidos = self.repartir(pesos, primera_ociosa=True)
+                primer_segundo = {fuente: concedidos[fuente][0] for fuente in concedidos}
+                # Ráfaga y presupuesto del primer segundo, repartidos según el peso
+                for fuente, peso in zip(("banco", "otra"), pesos):
+                    parte = 2 * self.presupuesto * peso / sum(pesos)
+                    self.assertAlmostEqual(primer_segundo[fuente], parte, delta=1.5)
+
+    def test_al_irse_una_fuente_la_otra_recupera_el_presupuesto(self):
+        reloj = RelojFalso()
+        scheduler = FairInferenceScheduler(self.presupuesto, clock=reloj)
+        scheduler.register("banco", 1)
+        scheduler.register("otra", 2)
+        scheduler.unregister("otra")
+        concedidos = 0
+        for frame in range(1, 91):
+            reloj.ahora = frame / 30
+            concedidos += scheduler.try_acquire("banco")
+        # Ráfaga (su cubeta de cuando eran dos) + 3 s del presupuesto entero
+        self.assertAlmostEqual(concedidos, 3 * self.presupuesto + self.presupuesto / 3, delta=1.5)
+
+    def test_dos_pipelines_comparten_el_presupuesto_segun_el_peso(self):
+        scheduler = FairInferenceScheduler(40)
+
+        class AnalizadorConPresupuesto(AnalizadorFalso):
+            def __init__(self, admit):
+                super().__init__()
+                self.admit = admit
+
+            def execute(self, frame):
+                self.admit()
+                return super().execute(frame)
+
+        pipelines = []
+        for nombre, peso in (("banco", 1), ("otra", 2)):
+            def build_analyzer(nombre=nombre, peso=peso):
+                scheduler.register(nombre, peso)
+                return AnalizadorConPresupuesto(scheduler.admission(nombre))
+
+            aperturas = []
+            pipeline = VideoPipeline(
+                nombre,
+                lambda source, aperturas=aperturas: LatestFrameCamera(
+                    source, width=64, height=48, capture_factory=lambda _: CapturaFalsa(aperturas)),
+                build_analyzer,
+                idle_timeout=0.1,
+                on_stop=lambda nombre=nombre: scheduler.unregister(nombre),
+            )
+            pipelines.append(pipeline)
+
+        banco = pipelines[0].subscribe()
+        next(banco)
+        time.sleep(0.5)
+        # 'otra' se suscribe después y con el doble de peso
+        otra = pipelines[1].subscribe()
+        next(otra)
+        # Se mide pasado un período de ráfaga (burst = 1 s)
+        time.sleep(1.0)
+        inicio = {n: s["granted"] for n, s in scheduler.stats()["sources"].items()}
+        time.sleep(1.5)
+        fin = {n: s["granted"] for n, s in scheduler.stats()["sources"].items()}
+        banco.close()
+        otra.close()
+        for pipeline in pipelines:
+            VideoPipelineTests.esperar(self, lambda pipeline=pipeline: pipeline.camera is None)
+
+        concedidos = {n: fin[n] - inicio[n] for n in fin}
+        self.assertGreater(concedidos["banco"], 0)
+        self.assertAlmostEqual(concedidos["otra"] / concedidos["banco"], 2, delta=0.6)
+        self.assertEqual(scheduler.stats()["sources"], {})
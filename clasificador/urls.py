@@ -10,6 +10,13 @@ urlpatterns = [
     path('page1/', plant_views.page_1, name='page1'),
     path('get_last_result/', plant_views.get_last_result, name='get_last_result'),
     path('get_plant_data/', plant_views.get_plant_data, name='get_plant_data'),
+    path('plant_events/', plant_views.plant_events, name='plant_events'),
+    path('analyze_frame/', plant_views.analyze_frame, name='analyze_frame'),
+    path('ready/', plant_views.ready, name='ready'),
+    path('video_stats/', plant_views.video_stats, name='video_stats'),
+    path('cameras/', plant_views.camera_list, name='camera_list'),
+    # Sin barra final: es la ruta que Prometheus consulta por defecto
+    path('metrics', plant_views.metrics, name='metrics'),
     path('manual_usuario/', plantas_views.manual_usuario, name='manual_usuario'),
 
     # ✅ RUTA CORREGIDA - Faltaba 'name'
@@ -72,3 +72,4 @@ with open("labels.pkl", "wb") as f:
     pickle.dump(train_gen.class_indices, f)
 
 print("✅ Modelo CNN entrenado y guardado como 'modelo_plantas_cnn.h5'")
+print("ℹ️ Para exportar las variantes cuantizadas (float16/int8) y su reporte: python exportar_modelo_cuantizado.py modelo_plantas_cnn.h5")
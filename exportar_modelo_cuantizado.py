@@ -0,0 +1,184 @@
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.preprocessing.image import ImageDataGenerator
+
+from clasificador.infraestructure.tf_classifier import with_uint8_input
+from clasificador.infraestructure.tflite_classifier import dequantize_output, prepare_input
+
+# -----------------------------
+# CONFIGURACIÓN
+# -----------------------------
+model_path = sys.argv[1] if len(sys.argv) > 1 else "modelo_plantas_cnn_v5.h5"
+dataset_path = "dataset_3"  # misma carpeta usada en entrenar_modelo_plantas.py
+img_size = (128, 128)
+calibration_samples = 200  # imágenes representativas para calibrar int8
+batch_size = 32  # tamaño del lote para la medición de latencia por lotes
+latency_runs = 50
+report_path = "reporte_cuantizacion.json"
+
+base_name = os.path.splitext(model_path)[0]
+
+
+# -----------------------------
+# DATOS (sin aumentación ni rescale: los modelos exportados reciben píxeles
+# uint8 y normalizan dentro del grafo)
+# -----------------------------
+datagen = ImageDataGenerator(validation_split=0.2)
+
+calib_gen = datagen.flow_from_directory(
+    dataset_path,
+    target_size=img_size,
+    batch_size=1,
+    subset='training',
+    shuffle=True,
+    seed=42,
+)
+
+val_gen = datagen.flow_from_directory(
+    dataset_path,
+    target_size=img_size,
+    batch_size=batch_size,
+    subset='validation',
+    shuffle=False,
+)
+
+
+def representative_dataset():
+    """Muestra representativa de dataset_3 para calibrar los rangos int8."""
+    for _ in range(min(calibration_samples, calib_gen.samples)):
+        image, _ = next(calib_gen)
+        yield [image.astype(np.uint8)]
+
+
+# -----------------------------
+# EXPORTACIÓN
+# -----------------------------
+model = with_uint8_input(tf.keras.models.load_model(model_path))
+
+
+def exportar(nombre, configurar):
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    configurar(converter)
+    path = f"{base_name}_{nombre}.tflite"
+    with open(path, "wb") as f:
+        f.write(converter.convert())
+    print(f"✅ Exportado {path}")
+    return path
+
+
+def config_float32(converter):
+    pass
+
+
+def config_float16(converter):
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.target_spec.supported_types = [tf.float16]
+
+
+def config_int8(converter):
+    # Cuantización entera completa: pesos, activaciones y salida (la entrada ya es uint8)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.uint8
+    converter.inference_output_type = tf.uint8
+
+
+variantes = {
+    "float32": exportar("float32", config_float32),
+    "float16": exportar("float16", config_float16),
+    "int8": exportar("int8", config_int8),
+}
+
+
+# -----------------------------
+# EVALUACIÓN
+# -----------------------------
+class Runner:
+    """Ejecuta una variante .tflite con lotes de tamaño arbitrario."""
+
+    def __init__(self, path):
+        self.interpreter = tf.lite.Interpreter(model_path=path, num_threads=os.cpu_count())
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()[0]
+        self.output_details = self.interpreter.get_output_details()[0]
+        self.batch = 1
+
+    def __call__(self, images):
+        if images.shape[0] != self.batch:
+            self.interpreter.resize_tensor_input(self.input_details["index"], images.shape)
+            self.interpreter.allocate_tensors()
+            self.batch = images.shape[0]
+        self.interpreter.set_tensor(self.input_details["index"], prepare_input(images, self.input_details))
+        self.interpreter.invoke()
+        pred = self.interpreter.get_tensor(self.output_details["index"])
+        return dequantize_output(pred, self.output_details)
+
+
+def medir_latencia(predict, images):
+    """Mediana en ms de `latency_runs` ejecuciones (tras un calentamiento)."""
+    predict(images)
+    tiempos = []
+    for _ in range(latency_runs):
+        inicio = time.perf_counter()
+        predict(images)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return float(np.median(tiempos))
+
+
+def evaluar(nombre, predict, size_bytes):
+    aciertos = 0
+    for i in range(len(val_gen)):
+        images, labels = val_gen[i]
+        pred = predict(images.astype(np.uint8))
+        aciertos += int(np.sum(np.argmax(pred, axis=1) == np.argmax(labels, axis=1)))
+
+    muestra, _ = val_gen[0]
+    muestra = muestra.astype(np.uint8)
+    single_ms = medir_latencia(predict, muestra[:1])
+    batch_ms = medir_latencia(predict, muestra)
+
+    return {
+        "variante": nombre,
+        "top1_accuracy": round(aciertos / val_gen.samples, 4),
+        "size_mb": round(size_bytes / (1024 * 1024), 2),
+        "latency_single_ms": round(single_ms, 2),
+        "latency_batch_ms": round(batch_ms, 2),
+        "latency_batch_per_image_ms": round(batch_ms / len(muestra), 3),
+    }
+
+
+resultados = [
+    evaluar("keras_float32", lambda x: model(x, training=False).numpy(), os.path.getsize(model_path))
+]
+for nombre, path in variantes.items():
+    resultados.append(evaluar(f"tflite_{nombre}", Runner(path), os.path.getsize(path)))
+
+# Comparación contra la línea base float32 de TFLite (mismo runtime)
+base = next(r for r in resultados if r["variante"] == "tflite_float32")
+for r in resultados:
+    r["accuracy_delta"] = round(r["top1_accuracy"] - base["top1_accuracy"], 4)
+    r["speedup_single"] = round(base["latency_single_ms"] / r["latency_single_ms"], 2)
+    r["speedup_batch"] = round(base["latency_batch_ms"] / r["latency_batch_ms"], 2)
+
+with open(report_path, "w") as f:
+    json.dump({
+        "model": model_path,
+        "validation_samples": val_gen.samples,
+        "calibration_samples": min(calibration_samples, calib_gen.samples),
+        "batch_size": batch_size,
+        "threads": os.cpu_count(),
+        "results": resultados,
+    }, f, indent=2)
+
+print(f"\n{'variante':<16}{'top1':>8}{'MB':>8}{'1 img ms':>10}{'lote ms':>10}{'x1':>7}{'xlote':>7}")
+for r in resultados:
+    print(f"{r['variante']:<16}{r['top1_accuracy']:>8}{r['size_mb']:>8}"
+          f"{r['latency_single_ms']:>10}{r['latency_batch_ms']:>10}"
+          f"{r['speedup_single']:>7}{r['speedup_batch']:>7}")
+print(f"✅ Reporte guardado en '{report_path}'")